@@ -9,6 +9,7 @@ from datetime import datetime
 from typing import List, Optional, Dict, Any
 
 from fastapi import APIRouter, HTTPException, status, Depends, Query
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel, Field
 
 from app.core.dependencies import get_medication_service, get_current_user
@@ -132,7 +133,9 @@ async def list_medication_logs_minimal(
     if end_date:
         filtered = [e for e in filtered if e['taken_at'] and e['taken_at'] <= end_date]
     sliced = filtered[offset: offset + limit]
-    return [MedicationLogResponseMinimal(**e) for e in sliced]
+    # Returning a response directly skips FastAPI re-validating the list
+    # against response_model (kept for the OpenAPI schema)
+    return ORJSONResponse([MedicationLogResponseMinimal(**e).model_dump(mode="json") for e in sliced])
 
 @router.get('/logs/medications/{log_id}', response_model=MedicationLogResponseMinimal)
 async def get_medication_log_minimal(
@@ -173,7 +176,7 @@ async def list_symptom_logs_minimal(
     offset: int = Query(default=0, ge=0)
 ) -> List[SymptomLogResponseMinimal]:
     sliced = _SYMPTOM_STORE[offset: offset + limit]
-    return [SymptomLogResponseMinimal(**e) for e in sliced]
+    return ORJSONResponse([SymptomLogResponseMinimal(**e).model_dump(mode="json") for e in sliced])
 
 @router.get('/logs/summary')
 async def logs_summary_minimal(
@@ -10,6 +10,7 @@ from datetime import datetime
 from contextlib import contextmanager
 from typing import Any, Dict, List, Optional
 from fastapi import APIRouter, Depends, HTTPException, status, Query, Request
+from fastapi.responses import ORJSONResponse
 from sqlmodel import Session
 import structlog
 
@@ -424,7 +425,8 @@ async def get_active_medications(
             "user_id": user_id
         })
 
-        return result
+        # Already validated above; a direct response skips response_model re-validation
+        return ORJSONResponse([med.model_dump(mode="json") for med in result])
 
     except Exception as e:
         logger.error("Failed to get active medications", extra={
@@ -492,7 +494,7 @@ async def search_medications(
             "active_only": str(active_only)
         })
 
-        return result
+        return ORJSONResponse([med.model_dump(mode="json") for med in result])
 
     except Exception as e:
         logger.error("Failed to search medications", extra={
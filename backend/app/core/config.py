@@ -7,12 +7,13 @@ It handles environment variables, validation, and provides typed configuration o
 
 import json
 import os
-from functools import lru_cache
 from typing import List, Optional, Union
 
-from pydantic import AnyHttpUrl, field_validator
+from pydantic import AnyHttpUrl, ValidationInfo, field_validator
 from pydantic_settings import BaseSettings
 
+_TRUE_VALUES = frozenset(("true", "1", "yes", "on"))
+
 
 class Settings(BaseSettings):
     """
@@ -42,6 +43,16 @@ class Settings(BaseSettings):
     DATABASE_URL: str = "sqlite:///app.db"
     DATABASE_TEST_URL: str = "sqlite:///test.db"
 
+    # Connection pool tuning (ignored for in-memory SQLite, which has no queue pool).
+    # POOL_SIZE is also the number of idle connections kept warm; overflow
+    # connections are closed when returned.
+    DATABASE_POOL_SIZE: int = 10
+    DATABASE_MAX_OVERFLOW: int = 20
+    DATABASE_POOL_TIMEOUT_SECONDS: int = 10
+    DATABASE_POOL_RECYCLE_SECONDS: int = 1800  # Replace connections older than this
+    DATABASE_POOL_PRE_PING: bool = True
+    DATABASE_STATEMENT_CACHE_SIZE: int = 1024  # asyncpg prepared statements per connection
+
     # CORS Configuration
     BACKEND_CORS_ORIGINS: List[AnyHttpUrl] = [
         "http://localhost:3000",
@@ -54,11 +65,16 @@ class Settings(BaseSettings):
     # Logging Configuration
     LOG_LEVEL: str = "INFO"
     LOG_JSON_OUTPUT: bool = False
+    LOG_BATCH_SIZE: int = 64  # Lines per stdout write; 1 disables batching
+    LOG_BATCH_MS: int = 50  # Max wait for a batch to fill
 
     # Feature Flags
     ENABLE_MEDICATION_MASTER: bool = False
     ENABLE_HEALTH_PASSPORT: bool = False
 
+    # Event loop: use uvloop when installed (uvicorn[standard]); False forces asyncio
+    USE_UVLOOP: bool = True
+
     # Rate Limiting
     RATE_LIMIT_PER_MINUTE: int = 60
 
@@ -76,12 +92,14 @@ class Settings(BaseSettings):
     # External Services (for future use)
     REDIS_URL: Optional[str] = None
 
-    @field_validator("BACKEND_CORS_ORIGINS", mode="before")
-    def assemble_cors_origins(cls, v: Union[str, List[str]]) -> Union[List[str], str]:
+    # Validators are shared across fields of the same kind so each parsing
+    # rule is registered (and maintained) once.
+    @field_validator("BACKEND_CORS_ORIGINS", "ALLOWED_HOSTS", mode="before")
+    def assemble_list(cls, v: Union[str, List[str]], info: ValidationInfo) -> Union[List[str], str]:
         """
-        Parse CORS origins from environment variable.
+        Parse CORS origins / allowed hosts from environment variable.
         
-        Accepts comma-separated string or list of URLs.
+        Accepts comma-separated string or JSON list.
         """
         if isinstance(v, str):
             v = v.strip()
@@ -92,11 +110,11 @@ class Settings(BaseSettings):
                 try:
                     parsed = json.loads(v)
                 except json.JSONDecodeError as exc:
-                    raise ValueError("Invalid JSON list for BACKEND_CORS_ORIGINS") from exc
+                    raise ValueError(f"Invalid JSON list for {info.field_name}") from exc
 
                 if isinstance(parsed, list):
                     return parsed
-                raise ValueError("BACKEND_CORS_ORIGINS must be a list")
+                raise ValueError(f"{info.field_name} must be a list")
 
             return [i.strip() for i in v.split(",") if i.strip()]
 
@@ -104,53 +122,11 @@ class Settings(BaseSettings):
             return v
         raise ValueError(v)
 
-    @field_validator("ALLOWED_HOSTS", mode="before")
-    def assemble_allowed_hosts(cls, v: Union[str, List[str]]) -> Union[List[str], str]:
-        """
-        Parse allowed hosts from environment variable.
-        
-        Accepts comma-separated string or list of hostnames.
-        """
+    @field_validator("DEBUG", "ENABLE_MEDICATION_MASTER", "ENABLE_HEALTH_PASSPORT", "USE_UVLOOP", mode="before")
+    def parse_flag(cls, v: Union[bool, str]) -> bool:
+        """Parse DEBUG, feature and runtime flags from string or boolean."""
         if isinstance(v, str):
-            v = v.strip()
-            if not v:
-                return []
-
-            if v.startswith("["):
-                try:
-                    parsed = json.loads(v)
-                except json.JSONDecodeError as exc:
-                    raise ValueError("Invalid JSON list for ALLOWED_HOSTS") from exc
-
-                if isinstance(parsed, list):
-                    return parsed
-                raise ValueError("ALLOWED_HOSTS must be a list")
-
-            return [i.strip() for i in v.split(",") if i.strip()]
-
-        if isinstance(v, list):
-            return v
-        raise ValueError(v)
-
-    @field_validator("DEBUG", mode="before")
-    def parse_debug(cls, v: Union[bool, str]) -> bool:
-        """Parse DEBUG setting from string or boolean."""
-        if isinstance(v, str):
-            return v.lower() in ("true", "1", "yes", "on")
-        return bool(v)
-
-    @field_validator("ENABLE_MEDICATION_MASTER", mode="before")
-    def parse_medication_master_flag(cls, v: Union[bool, str]) -> bool:
-        """Parse ENABLE_MEDICATION_MASTER feature flag."""
-        if isinstance(v, str):
-            return v.lower() in ("true", "1", "yes", "on")
-        return bool(v)
-
-    @field_validator("ENABLE_HEALTH_PASSPORT", mode="before")
-    def parse_health_passport_flag(cls, v: Union[bool, str]) -> bool:
-        """Parse ENABLE_HEALTH_PASSPORT feature flag."""
-        if isinstance(v, str):
-            return v.lower() in ("true", "1", "yes", "on")
+            return v.lower() in _TRUE_VALUES
         return bool(v)
 
     @field_validator("DATABASE_URL", mode="before")
@@ -170,18 +146,11 @@ class Settings(BaseSettings):
 
         return v
 
-    @field_validator("SECRET_KEY")
-    def validate_secret_key(cls, v: str) -> str:
+    @field_validator("SECRET_KEY", "JWT_SECRET")
+    def validate_secret_length(cls, v: str, info: ValidationInfo) -> str:
         """Validate secret key length for security."""
         if len(v) < 32:
-            raise ValueError("SECRET_KEY must be at least 32 characters long")
-        return v
-
-    @field_validator("JWT_SECRET")
-    def validate_jwt_secret(cls, v: str) -> str:
-        """Validate JWT secret key length for security."""
-        if len(v) < 32:
-            raise ValueError("JWT_SECRET must be at least 32 characters long")
+            raise ValueError(f"{info.field_name} must be at least 32 characters long")
         return v
 
     @property
@@ -224,22 +193,25 @@ class TestSettings(Settings):
     LOG_JSON_OUTPUT: bool = False
 
 
-@lru_cache()
+_settings: Optional[Settings] = None
+
+
 def get_settings() -> Settings:
     """
     Get cached application settings.
     
-    Uses LRU cache to avoid re-parsing environment variables on every call.
-    Cache is cleared when the process restarts.
+    Settings are built on first use and kept in a module-level singleton,
+    so environment variables are parsed once per process and later calls
+    are a global load and an ``is None`` check.
     
     Returns:
         Settings: Application configuration object
     """
-    # Check if we're in test mode
-    if os.getenv("TESTING") == "true":
-        return TestSettings()
-
-    return Settings()
+    global _settings
+    if _settings is None:
+        # Check if we're in test mode
+        _settings = TestSettings() if os.getenv("TESTING") == "true" else Settings()
+    return _settings
 
 
 # Example of how to use settings in other modules
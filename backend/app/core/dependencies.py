@@ -6,6 +6,7 @@ including database sessions, authentication, configuration, and service layer
 components following FastAPI best practices.
 """
 
+from contextlib import closing
 from functools import lru_cache
 from typing import Annotated, AsyncGenerator, Generator, Optional
 
@@ -164,15 +165,14 @@ def get_sync_db_session() -> Generator[Session, None, None]:
     db_manager = get_database()
     # Use SQLModel Session directly for typing consistency
     wrapper = db_manager.get_session()
-    session = next(iter(wrapper))  # underlying Session instance
-    try:
-        yield session  # type: ignore[misc]
-    except Exception as e:
-        logger.error("Database session error", error=str(e))
-        session.rollback()
-        raise
-    finally:
-        session.close()
+    # closing() is the single cleanup path for the underlying Session
+    with closing(next(iter(wrapper))) as session:
+        try:
+            yield session  # type: ignore[misc]
+        except Exception as e:
+            logger.error("Database session error", error=str(e))
+            session.rollback()
+            raise
 
 
 async def get_async_db_session() -> AsyncGenerator[AsyncSession, None]:
@@ -189,6 +189,7 @@ async def get_async_db_session() -> AsyncGenerator[AsyncSession, None]:
             return result.scalars().all()
     """
     db_manager = get_database()
+    # Leaving the context manager closes the session; no extra close() needed
     async with db_manager.get_async_session() as session:
         try:
             yield session
@@ -196,8 +197,6 @@ async def get_async_db_session() -> AsyncGenerator[AsyncSession, None]:
             logger.error("Async database session error", error=str(e))
             await session.rollback()
             raise
-        finally:
-            await session.close()
 
 
 def get_db_manager() -> DatabaseManager:
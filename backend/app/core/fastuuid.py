@@ -0,0 +1,58 @@
+"""
+Fast Request Identifier Generation
+
+This module provides pooled random identifier generators for the request
+path. Instead of one ``os.urandom`` syscall per identifier (``uuid.uuid4()``),
+randomness is drawn in 4 KiB blocks per thread and identifiers are sliced
+from it.
+"""
+
+import os
+import threading
+
+_POOL_SIZE = 4096
+_UUID_BYTES = 16
+_SHORT_ID_BYTES = 8
+
+_local = threading.local()
+
+
+def _take(size: int) -> bytes:
+    """Slice ``size`` random bytes from the calling thread's pool, refilling as needed."""
+    pool = getattr(_local, "pool", None)
+    offset = getattr(_local, "offset", _POOL_SIZE)
+    if pool is None or offset + size > _POOL_SIZE:
+        pool = _local.pool = os.urandom(_POOL_SIZE)
+        offset = 0
+    _local.offset = offset + size
+    return pool[offset:offset + size]
+
+
+def uuid4_hex() -> str:
+    """
+    Generate a random RFC 4122 version 4 UUID string.
+
+    The output format matches ``str(uuid.uuid4())``.
+
+    Returns:
+        str: Hyphenated lowercase UUID, e.g. ``"1b4e28ba-2fa1-4d2b-a883-..."``
+    """
+    raw = bytearray(_take(_UUID_BYTES))
+    raw[6] = (raw[6] & 0x0F) | 0x40  # version 4
+    raw[8] = (raw[8] & 0x3F) | 0x80  # RFC 4122 variant
+
+    h = raw.hex()
+    return f"{h[0:8]}-{h[8:12]}-{h[12:16]}-{h[16:20]}-{h[20:32]}"
+
+
+def short_id_hex() -> str:
+    """
+    Generate a random 64-bit identifier as 16 lowercase hex characters.
+
+    Used for span IDs, which only need to be unique within a trace; the
+    width matches a W3C span ID. Request IDs stay in UUID format.
+
+    Returns:
+        str: 16-character hex string
+    """
+    return _take(_SHORT_ID_BYTES).hex()
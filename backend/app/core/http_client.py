@@ -7,15 +7,30 @@ service integration.
 """
 
 import asyncio
-import json
+import logging
+import random
 import time
 from contextlib import asynccontextmanager
 from dataclasses import dataclass
 from datetime import datetime
-from typing import Any, AsyncGenerator, Dict, List, Optional
+from functools import lru_cache
+from types import MappingProxyType
+from typing import (
+    Any,
+    AsyncGenerator,
+    Dict,
+    Iterable,
+    List,
+    Literal,
+    Mapping,
+    Optional,
+    Tuple,
+    Union,
+)
 from urllib.parse import urljoin
 
 import httpx
+import orjson
 import structlog
 from pydantic import BaseModel, Field, field_validator
 
@@ -25,6 +40,12 @@ settings = get_settings()
 logger = structlog.get_logger(__name__)
 
 
+def _info_enabled() -> bool:
+    """Check whether INFO records would be emitted, so log payloads can be skipped."""
+    is_enabled_for = getattr(logger, "isEnabledFor", None)
+    return is_enabled_for(logging.INFO) if is_enabled_for is not None else True
+
+
 class HTTPClientError(Exception):
     """Base exception for HTTP client errors."""
     pass
@@ -58,6 +79,7 @@ class RetryConfig(BaseModel):
     base_delay: float = Field(default=1.0, gt=0)
     max_delay: float = Field(default=60.0, gt=0)
     exponential_backoff: bool = Field(default=True)
+    jitter: bool = Field(default=True)  # Decorrelated jitter for exponential backoff
     retry_on_status: List[int] = Field(default_factory=lambda: [429, 500, 502, 503, 504])
 
     @field_validator('max_delay')
@@ -91,11 +113,133 @@ class HTTPClientConfig(BaseModel):
     verify_ssl: bool = Field(default=True)
     follow_redirects: bool = Field(default=True)
     max_redirects: int = Field(default=5, ge=0)
+    transport: Literal["httpx", "aiohttp"] = Field(default="httpx")
+    max_connections: int = Field(default=1000, gt=0)
+    max_keepalive_connections: int = Field(default=100, ge=0)
 
     class Config:
         arbitrary_types_allowed = True
 
 
+# =============================================================================
+# aiohttp Transport
+# =============================================================================
+
+# httpx.AsyncClient.request kwargs that AiohttpClient can honour
+_AIOHTTP_REQUEST_KWARGS = frozenset(
+    {"params", "headers", "json", "data", "content", "cookies", "timeout", "follow_redirects"}
+)
+
+
+class AiohttpResponse:
+    """
+    Minimal response adapter exposing the httpx.Response surface used by callers.
+
+    The body is read eagerly while the aiohttp connection is still held so the
+    adapter can outlive the underlying response context.
+    """
+
+    __slots__ = ("status_code", "headers", "content", "encoding")
+
+    def __init__(
+        self,
+        status_code: int,
+        headers: Union[Mapping[str, str], Iterable[Tuple[str, str]]],
+        content: bytes,
+        encoding: Optional[str],
+    ):
+        self.status_code = status_code
+        # Case-insensitive and multi-value aware, like httpx.Response.headers
+        self.headers = httpx.Headers(headers)
+        self.content = content
+        self.encoding = encoding or "utf-8"
+
+    @property
+    def text(self) -> str:
+        """Decode the response body."""
+        return self.content.decode(self.encoding, errors="replace")
+
+    def json(self) -> Any:
+        """Parse the response body as JSON."""
+        return orjson.loads(self.content)
+
+
+class AiohttpClient:
+    """
+    aiohttp-backed client with the subset of the httpx.AsyncClient API used here.
+
+    aiohttp is an optional dependency (``pip install .[aiohttp]``) and is only
+    imported when ``HTTPClientConfig.transport == "aiohttp"``. Transport errors
+    are translated to their httpx equivalents so retry handling stays shared.
+    """
+
+    def __init__(self, config: HTTPClientConfig):
+        import aiohttp
+
+        self._aiohttp = aiohttp
+        self.config = config
+        self.base_url = config.base_url
+        self._session = None
+
+    def _get_session(self):
+        """Create the session lazily so it binds to the running event loop."""
+        if self._session is None or self._session.closed:
+            aiohttp = self._aiohttp
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(
+                    limit=self.config.max_connections,
+                    ssl=None if self.config.verify_ssl else False,
+                ),
+                timeout=aiohttp.ClientTimeout(total=self.config.timeout),
+                headers=self.config.default_headers,
+            )
+        return self._session
+
+    def _request_options(self, kwargs: Dict[str, Any]) -> Dict[str, Any]:
+        """Translate httpx-style request kwargs to aiohttp ones.
+
+        Raises:
+            TypeError: For httpx kwargs this transport does not support
+        """
+        unsupported = kwargs.keys() - _AIOHTTP_REQUEST_KWARGS
+        if unsupported:
+            raise TypeError(f"aiohttp transport does not support: {', '.join(sorted(unsupported))}")
+
+        options = {key: kwargs[key] for key in ("params", "headers", "json", "data", "cookies") if key in kwargs}
+        if "content" in kwargs:
+            if "data" in kwargs:
+                raise TypeError("'content' and 'data' cannot be combined")
+            options["data"] = kwargs["content"]
+        if "timeout" in kwargs:
+            timeout = kwargs["timeout"]
+            if isinstance(timeout, httpx.Timeout):
+                options["timeout"] = self._aiohttp.ClientTimeout(
+                    connect=timeout.connect, sock_read=timeout.read
+                )
+            else:
+                options["timeout"] = self._aiohttp.ClientTimeout(total=timeout)
+        options["allow_redirects"] = kwargs.get("follow_redirects", self.config.follow_redirects)
+        options["max_redirects"] = self.config.max_redirects
+        return options
+
+    async def request(self, method: str, url: str, **kwargs) -> AiohttpResponse:
+        """Send a request and return a fully-read response adapter."""
+        options = self._request_options(kwargs)
+        try:
+            async with self._get_session().request(method, url, **options) as resp:
+                content = await resp.read()
+                return AiohttpResponse(resp.status, resp.headers.items(), content, resp.charset)
+        except asyncio.TimeoutError as e:
+            raise httpx.TimeoutException(str(e) or "Request timed out") from e
+        except self._aiohttp.ClientError as e:
+            raise httpx.RequestError(str(e)) from e
+
+    async def aclose(self) -> None:
+        """Close the underlying session."""
+        if self._session is not None:
+            await self._session.close()
+
+
 # =============================================================================
 # Rate Limiter
 # =============================================================================
@@ -106,14 +250,39 @@ class TokenBucketRateLimiter:
     
     This implementation allows burst requests up to burst_size,
     then limits to requests_per_second rate.
+
+    Tokens are refilled lazily on acquire. The refill-and-take step never
+    awaits, so it is atomic with respect to other coroutines on the event
+    loop and needs no lock.
     """
 
     def __init__(self, requests_per_second: float, burst_size: int):
         self.requests_per_second = requests_per_second
         self.burst_size = burst_size
         self.tokens = burst_size
-        self.last_update = time.time()
-        self._lock = asyncio.Lock()
+        self.last_update = time.monotonic()
+
+    def try_acquire_nowait(self, tokens: int = 1) -> bool:
+        """
+        Acquire tokens synchronously, without yielding to the event loop.
+
+        Args:
+            tokens: Number of tokens to acquire
+
+        Returns:
+            bool: True if tokens acquired, False if rate limited
+        """
+        now = time.monotonic()
+        elapsed = now - self.last_update
+
+        # Add tokens based on elapsed time
+        self.tokens = min(self.burst_size, self.tokens + elapsed * self.requests_per_second)
+        self.last_update = now
+
+        if self.tokens >= tokens:
+            self.tokens -= tokens
+            return True
+        return False
 
     async def acquire(self, tokens: int = 1) -> bool:
         """
@@ -125,20 +294,7 @@ class TokenBucketRateLimiter:
         Returns:
             bool: True if tokens acquired, False if rate limited
         """
-        async with self._lock:
-            now = time.time()
-            elapsed = now - self.last_update
-
-            # Add tokens based on elapsed time
-            tokens_to_add = elapsed * self.requests_per_second
-            self.tokens = min(self.burst_size, self.tokens + tokens_to_add)
-            self.last_update = now
-
-            if self.tokens >= tokens:
-                self.tokens -= tokens
-                return True
-            else:
-                return False
+        return self.try_acquire_nowait(tokens)
 
     async def wait_for_tokens(self, tokens: int = 1) -> None:
         """
@@ -157,14 +313,17 @@ class TokenBucketRateLimiter:
 # Request/Response Logging
 # =============================================================================
 
-@dataclass
+_SENSITIVE_HEADERS = frozenset({"authorization", "x-api-key"})
+
+
+@dataclass(slots=True)
 class RequestLog:
     """Log entry for HTTP request."""
     method: str
     url: str
     headers: Dict[str, str]
-    body: Optional[str]
-    timestamp: datetime
+    body: Optional[Union[str, bytes]]
+    timestamp: Optional[datetime] = None
     request_id: Optional[str] = None
 
     def to_dict(self) -> Dict[str, Any]:
@@ -172,44 +331,111 @@ class RequestLog:
         headers = {}
         if self.headers:
             headers = {k: v for k, v in self.headers.items()
-                      if k.lower() not in ["authorization", "x-api-key"]}  # Filter sensitive headers
+                      if k.lower() not in _SENSITIVE_HEADERS}  # Filter sensitive headers
 
-        return {
+        data = {
             "method": self.method,
             "url": self.url,
             "headers": headers,
             "body_size": len(self.body) if self.body else 0,
-            "timestamp": self.timestamp.isoformat(),
             "request_id": self.request_id
         }
+        # The structlog TimeStamper stamps emitted records; only explicit timestamps are forwarded
+        if self.timestamp is not None:
+            data["timestamp"] = self.timestamp.isoformat()
+        return data
 
 
-@dataclass
+@dataclass(slots=True)
 class ResponseLog:
     """Log entry for HTTP response."""
     status_code: int
     headers: Dict[str, str]
-    body: Optional[str]
+    body: Optional[Union[str, bytes]]
     response_time_ms: float
-    timestamp: datetime
+    timestamp: Optional[datetime] = None
     request_id: Optional[str] = None
 
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary for structured logging."""
-        return {
+        data = {
             "status_code": self.status_code,
             "headers": dict(self.headers),
             "body_size": len(self.body) if self.body else 0,
             "response_time_ms": self.response_time_ms,
-            "timestamp": self.timestamp.isoformat(),
             "request_id": self.request_id
         }
+        if self.timestamp is not None:
+            data["timestamp"] = self.timestamp.isoformat()
+        return data
 
 
 # =============================================================================
 # HTTP Client
 # =============================================================================
 
+_HTTP_METHODS = ("GET", "POST", "PUT", "PATCH", "DELETE", "HEAD", "OPTIONS")
+_METHOD_NORM: Dict[str, str] = {**{m: m for m in _HTTP_METHODS}, **{m.lower(): m for m in _HTTP_METHODS}}
+_EMPTY_HEADERS: MappingProxyType = MappingProxyType({})
+
+
+@lru_cache(maxsize=1024)
+def _build_url_cached(base_url: str, endpoint: str) -> str:
+    """Join a normalized base URL (trailing slash) with an endpoint."""
+    if endpoint.startswith(('http://', 'https://')):
+        return endpoint
+    return urljoin(base_url, endpoint.lstrip('/'))
+
+
+def _request_log(method: str, url: str, kwargs: Dict[str, Any], request_id: Optional[str]) -> RequestLog:
+    """Build the request log entry from httpx-style request kwargs."""
+    request_body = kwargs.get('json') or kwargs.get('data') or ""
+    if isinstance(request_body, dict):
+        request_body = orjson.dumps(request_body, option=orjson.OPT_NON_STR_KEYS)
+    elif not isinstance(request_body, (str, bytes)):
+        request_body = str(request_body)
+
+    return RequestLog(
+        method=method,
+        url=url,
+        headers=kwargs.get('headers') or _EMPTY_HEADERS,
+        body=request_body or None,
+        request_id=request_id
+    )
+
+
+def _api_response_error(response: httpx.Response) -> APIResponseError:
+    """Build the APIResponseError for a 4xx/5xx response."""
+    # Read the body once; parse it and decode only the message preview
+    raw = response.content
+    error_data = None
+    try:
+        error_data = orjson.loads(raw)
+    except orjson.JSONDecodeError:
+        pass
+
+    return APIResponseError(
+        response.status_code,
+        f"HTTP {response.status_code}: {raw[:200].decode('utf-8', errors='replace')}",
+        error_data
+    )
+
+
+def _transport_error(error: httpx.RequestError, url: str, request_id: Optional[str]) -> HTTPClientError:
+    """
+    Log a failed transport call and map it to this module's exceptions.
+
+    Both transports raise httpx errors here (AiohttpClient translates
+    aiohttp's), so timeouts become TimeoutError and anything else
+    HTTPClientError.
+    """
+    if isinstance(error, httpx.TimeoutException):
+        logger.error("Request timeout", url=url, request_id=request_id, error=str(error))
+        return TimeoutError(f"Request timeout: {str(error)}")
+    logger.error("Request error", url=url, request_id=request_id, error=str(error))
+    return HTTPClientError(f"Request error: {str(error)}")
+
+
 class EnhancedHTTPClient:
     """
     Enhanced HTTP client with retry, rate limiting, and comprehensive logging.
@@ -225,6 +451,7 @@ class EnhancedHTTPClient:
     def __init__(self, config: HTTPClientConfig):
         self.config = config
         self.rate_limiter = None
+        self._base_url_norm = config.base_url.rstrip('/') + '/'
 
         if config.rate_limit_config:
             self.rate_limiter = TokenBucketRateLimiter(
@@ -232,15 +459,22 @@ class EnhancedHTTPClient:
                 config.rate_limit_config.burst_size
             )
 
-        # Create httpx client
-        self._client = httpx.AsyncClient(
-            base_url=config.base_url,
-            timeout=config.timeout,
-            headers=config.default_headers,
-            verify=config.verify_ssl,
-            follow_redirects=config.follow_redirects,
-            max_redirects=config.max_redirects
-        )
+        # Create transport client
+        if config.transport == "aiohttp":
+            self._client = AiohttpClient(config)
+        else:
+            self._client = httpx.AsyncClient(
+                base_url=config.base_url,
+                timeout=config.timeout,
+                headers=config.default_headers,
+                verify=config.verify_ssl,
+                follow_redirects=config.follow_redirects,
+                max_redirects=config.max_redirects,
+                limits=httpx.Limits(
+                    max_connections=config.max_connections,
+                    max_keepalive_connections=config.max_keepalive_connections,
+                ),
+            )
 
     async def __aenter__(self):
         """Async context manager entry."""
@@ -256,9 +490,7 @@ class EnhancedHTTPClient:
 
     def _build_url(self, endpoint: str) -> str:
         """Build full URL from endpoint."""
-        if endpoint.startswith(('http://', 'https://')):
-            return endpoint
-        return urljoin(self.config.base_url.rstrip('/') + '/', endpoint.lstrip('/'))
+        return _build_url_cached(self._base_url_norm, endpoint)
 
     def _should_retry(self, status_code: int, attempt: int) -> bool:
         """Check if request should be retried."""
@@ -266,14 +498,25 @@ class EnhancedHTTPClient:
             return False
         return status_code in self.config.retry_config.retry_on_status
 
-    def _calculate_delay(self, attempt: int) -> float:
-        """Calculate delay before retry."""
-        if self.config.retry_config.exponential_backoff:
-            delay = self.config.retry_config.base_delay * (2 ** attempt)
+    def _calculate_delay(self, attempt: int, last_delay: Optional[float] = None) -> float:
+        """
+        Calculate delay before retry.
+
+        With jitter enabled, exponential backoff uses decorrelated jitter
+        (uniform between base_delay and 3x the previous delay) so clients
+        failing together do not retry in lock-step.
+        """
+        retry_config = self.config.retry_config
+        if retry_config.exponential_backoff:
+            if retry_config.jitter:
+                previous = last_delay or retry_config.base_delay
+                delay = random.uniform(retry_config.base_delay, previous * 3)
+            else:
+                delay = retry_config.base_delay * (2 ** attempt)
         else:
-            delay = self.config.retry_config.base_delay
+            delay = retry_config.base_delay
 
-        return min(delay, self.config.retry_config.max_delay)
+        return min(delay, retry_config.max_delay)
 
     async def _make_request(
         self,
@@ -297,56 +540,49 @@ class EnhancedHTTPClient:
             TimeoutError: If request times out
             APIResponseError: If API returns error
         """
+        method = _METHOD_NORM.get(method) or method.upper()
         url = self._build_url(endpoint)
         request_id = kwargs.pop('request_id', None)
 
         # Apply rate limiting
         if self.rate_limiter:
-            if not await self.rate_limiter.acquire():
+            if not self.rate_limiter.try_acquire_nowait():
                 logger.warning("Rate limit exceeded", url=url, request_id=request_id)
                 raise RateLimitExceededError("Rate limit exceeded")
 
-        # Log request
-        request_headers = kwargs.get('headers', {}) or {}
-        request_body = kwargs.get('json') or kwargs.get('data') or ""
-        if isinstance(request_body, dict):
-            request_body = json.dumps(request_body)
-
-        request_log = RequestLog(
-            method=method.upper(),
-            url=url,
-            headers=request_headers,
-            body=str(request_body) if request_body else None,
-            timestamp=datetime.utcnow(),
-            request_id=request_id
-        )
-
-        logger.info("HTTP request started", **request_log.to_dict())
+        # Log request (payloads are only built when INFO is enabled)
+        log_info = _info_enabled()
+        if log_info:
+            logger.info("HTTP request started", **_request_log(method, url, kwargs, request_id).to_dict())
 
+        # Loop clock is monotonic, so response times survive wall-clock jumps
+        loop = asyncio.get_running_loop()
         attempt = 0
-        start_time = time.time()
+        delay = None
+        start_time = loop.time()
 
         while True:
             try:
                 response = await self._client.request(method, url, **kwargs)
-                response_time_ms = (time.time() - start_time) * 1000
+                response_time_ms = (loop.time() - start_time) * 1000
 
                 # Log response
-                response_log = ResponseLog(
-                    status_code=response.status_code,
-                    headers=dict(response.headers),
-                    body=response.text if response.status_code >= 400 else None,
-                    response_time_ms=response_time_ms,
-                    timestamp=datetime.utcnow(),
-                    request_id=request_id
-                )
+                if log_info:
+                    response_log = ResponseLog(
+                        status_code=response.status_code,
+                        headers=response.headers,  # copied once in to_dict()
+                        body=response.content if response.status_code >= 400 else None,
+                        response_time_ms=response_time_ms,
+                        request_id=request_id
+                    )
 
-                logger.info("HTTP response received", **response_log.to_dict())
+                    logger.info("HTTP response received", **response_log.to_dict())
 
                 # Check if retry is needed
                 if self._should_retry(response.status_code, attempt):
+                    # Back off from base_delay; no sleep follows the last attempt
+                    delay = self._calculate_delay(attempt, delay)
                     attempt += 1
-                    delay = self._calculate_delay(attempt)
 
                     logger.warning(
                         "Request failed, retrying",
@@ -358,29 +594,21 @@ class EnhancedHTTPClient:
                     )
 
                     await asyncio.sleep(delay)
-                    start_time = time.time()  # Reset timer for retry
+                    start_time = loop.time()  # Reset timer for retry
                     continue
 
                 # Check for client/server errors
                 if response.status_code >= 400:
-                    error_data = None
-                    try:
-                        error_data = response.json()
-                    except (json.JSONDecodeError, ValueError):
-                        pass
-
-                    raise APIResponseError(
-                        response.status_code,
-                        f"HTTP {response.status_code}: {response.text[:200]}",
-                        error_data
-                    )
+                    raise _api_response_error(response)
 
                 return response
 
-            except httpx.TimeoutException as e:
-                if self._should_retry(0, attempt):  # Treat timeout as retryable
+            except httpx.RequestError as e:
+                # Timeouts are retryable; other transport errors are not
+                if isinstance(e, httpx.TimeoutException) and self._should_retry(0, attempt):
+                    # Back off from base_delay; no sleep follows the last attempt
+                    delay = self._calculate_delay(attempt, delay)
                     attempt += 1
-                    delay = self._calculate_delay(attempt)
 
                     logger.warning(
                         "Request timeout, retrying",
@@ -392,15 +620,10 @@ class EnhancedHTTPClient:
                     )
 
                     await asyncio.sleep(delay)
-                    start_time = time.time()
+                    start_time = loop.time()
                     continue
 
-                logger.error("Request timeout", url=url, request_id=request_id, error=str(e))
-                raise TimeoutError(f"Request timeout: {str(e)}")
-
-            except httpx.RequestError as e:
-                logger.error("Request error", url=url, request_id=request_id, error=str(e))
-                raise HTTPClientError(f"Request error: {str(e)}")
+                raise _transport_error(e, url, request_id) from e
 
     async def get(
         self,
@@ -492,17 +715,27 @@ class EnhancedHTTPClient:
 # =============================================================================
 
 class HTTPClientRegistry:
-    """Registry for managing multiple HTTP clients."""
+    """
+    Registry for managing multiple HTTP clients.
+
+    Clients are held in a read-only snapshot that is replaced wholesale on
+    register/remove (copy-on-write), so lookups on the request path are a
+    single mapping read and never observe a half-updated registry.
+    """
+
+    __slots__ = ("_clients",)
 
     def __init__(self):
-        self._clients: Dict[str, EnhancedHTTPClient] = {}
+        self._clients: Mapping[str, EnhancedHTTPClient] = MappingProxyType({})
 
     def register(self, name: str, config: HTTPClientConfig) -> None:
         """Register a new HTTP client."""
         if name in self._clients:
             logger.warning("Overwriting existing HTTP client", client_name=name)
 
-        self._clients[name] = EnhancedHTTPClient(config)
+        clients = dict(self._clients)
+        clients[name] = EnhancedHTTPClient(config)
+        self._clients = MappingProxyType(clients)
         logger.info("HTTP client registered", client_name=name, base_url=config.base_url)
 
     def get(self, name: str) -> Optional[EnhancedHTTPClient]:
@@ -512,20 +745,23 @@ class HTTPClientRegistry:
     def remove(self, name: str) -> None:
         """Remove HTTP client."""
         if name in self._clients:
-            del self._clients[name]
+            clients = dict(self._clients)
+            del clients[name]
+            self._clients = MappingProxyType(clients)
             logger.info("HTTP client removed", client_name=name)
 
     async def close_all(self) -> None:
         """Close all registered clients."""
-        for name, client in self._clients.items():
+        clients = self._clients
+        self._clients = MappingProxyType({})
+
+        for name, client in clients.items():
             try:
                 await client.close()
                 logger.info("HTTP client closed", client_name=name)
             except Exception as e:
                 logger.error("Error closing HTTP client", client_name=name, error=str(e))
 
-        self._clients.clear()
-
     def list_clients(self) -> List[str]:
         """List all registered client names."""
         return list(self._clients.keys())
@@ -534,6 +770,10 @@ class HTTPClientRegistry:
 # Global client registry
 _client_registry = HTTPClientRegistry()
 
+# Shared make_simple_request client and the event loop its connection pool is bound to
+_simple_client: Optional[EnhancedHTTPClient] = None
+_simple_client_loop: Optional[asyncio.AbstractEventLoop] = None
+
 
 def get_client_registry() -> HTTPClientRegistry:
     """Get global HTTP client registry."""
@@ -635,11 +875,42 @@ async def make_simple_request(
         data = await make_simple_request("GET", "https://api.example.com/users")
         print(data["users"])
     """
-    config = HTTPClientConfig(base_url="")
+    client = await _get_simple_client()
+    response = await client._make_request(method, url, **kwargs)
+    return response.json()
+
+
+async def _get_simple_client() -> EnhancedHTTPClient:
+    """
+    Return the shared client used by make_simple_request.
+
+    Pooled connections belong to the event loop that opened them, so the
+    client is rebuilt when called from a different loop than the one it was
+    created on, and the old one is released (see _discard_simple_client).
+    Creation does not await, so the check-and-set needs no lock.
+    """
+    global _simple_client, _simple_client_loop
+
+    loop = asyncio.get_running_loop()
+    if _simple_client is None or _simple_client_loop is not loop:
+        if _simple_client is not None:
+            _discard_simple_client(_simple_client, _simple_client_loop)
+        _simple_client = EnhancedHTTPClient(HTTPClientConfig(base_url=""))
+        _simple_client_loop = loop
+    return _simple_client
+
+
+def _discard_simple_client(client: EnhancedHTTPClient, loop: asyncio.AbstractEventLoop) -> None:
+    """
+    Release a shared client that belongs to another event loop.
 
-    async with create_client(config) as client:
-        response = await client._make_request(method, url, **kwargs)
-        return response.json()
+    A loop that is still running closes the client itself. A stopped or
+    closed loop cannot, so its pooled connections are dropped with a warning.
+    """
+    if loop.is_running():
+        asyncio.run_coroutine_threadsafe(client.close(), loop)
+    else:
+        logger.warning("Dropping shared HTTP client from a stopped event loop without closing its connections")
 
 
 # =============================================================================
@@ -673,8 +944,18 @@ async def shutdown_http_clients() -> None:
     
     Add this to your FastAPI lifespan or shutdown event.
     """
+    global _simple_client, _simple_client_loop
+
     registry = get_client_registry()
     await registry.close_all()
+
+    if _simple_client is not None:
+        if _simple_client_loop is asyncio.get_running_loop():
+            await _simple_client.close()
+        else:
+            _discard_simple_client(_simple_client, _simple_client_loop)
+    _simple_client = _simple_client_loop = None
+
     logger.info("HTTP clients shut down")
 
 
@@ -6,9 +6,14 @@ It uses structlog for structured logging with JSON output suitable for productio
 """
 
 import logging
+import queue
+import re
 import sys
-from typing import Any, Dict, Optional
+import threading
+import time
+from typing import Any, Dict, List, Optional, Union
 
+import orjson
 import structlog
 from structlog.types import EventDict, Processor
 
@@ -48,6 +53,70 @@ def add_service_info(logger: logging.Logger, method_name: str, event_dict: Event
     return event_dict
 
 
+_SENSITIVE_FIELDS = frozenset({
+    "password", "token", "secret", "key", "authorization",
+    "ssn", "social_security", "credit_card", "medical_record_number",
+    "patient_id", "health_data", "symptoms", "medications"
+})
+_REDACTED = "***REDACTED***"
+# Matches "field": <scalar> inside serialized JSON (e.g. logged request/response bodies)
+_SENSITIVE_JSON_RE = re.compile(
+    r'"(' + "|".join(map(re.escape, sorted(_SENSITIVE_FIELDS))) + r')"\s*:\s*(?:"(?:[^"\\]|\\.)*"|-?\d+(?:\.\d+)?|true|false|null)',
+    re.IGNORECASE,
+)
+
+
+def _redact(data: Any) -> Any:
+    """
+    Redact sensitive keys in nested containers.
+
+    Containers are copied only when something inside them changes, so the
+    common case (no sensitive keys) allocates nothing and caller-owned
+    objects are never mutated.
+    """
+    if isinstance(data, dict):
+        return _redact_dict(data)
+    if isinstance(data, (list, tuple)):
+        return _redact_sequence(data)
+    if isinstance(data, str) and '"' in data:
+        return _redact_json_text(data)
+    return data
+
+
+def _redact_dict(data: dict) -> dict:
+    """Redact a dict, returning ``data`` itself when nothing changes."""
+    redacted = None
+    for k, v in data.items():
+        if isinstance(k, str) and k.casefold() in _SENSITIVE_FIELDS:
+            new = _REDACTED
+        else:
+            new = _redact(v)
+            if new is v:
+                continue
+        if redacted is None:
+            redacted = dict(data)
+        redacted[k] = new
+    return data if redacted is None else redacted
+
+
+def _redact_sequence(data: Union[list, tuple]) -> Union[list, tuple]:
+    """Redact list/tuple items, returning ``data`` itself when nothing changes."""
+    items = None
+    for i, item in enumerate(data):
+        new = _redact(item)
+        if new is not item:
+            if items is None:
+                items = list(data)
+            items[i] = new
+    return data if items is None else items
+
+
+def _redact_json_text(data: str) -> str:
+    """Redact sensitive scalar members in serialized JSON text."""
+    redacted_text, count = _SENSITIVE_JSON_RE.subn(r'"\1": "***REDACTED***"', data)
+    return redacted_text if count else data
+
+
 def filter_sensitive_data(logger: logging.Logger, method_name: str, event_dict: EventDict) -> EventDict:
     """
     Filter sensitive data from log entries for security and privacy compliance.
@@ -62,29 +131,116 @@ def filter_sensitive_data(logger: logging.Logger, method_name: str, event_dict:
     Returns:
         Updated event dictionary with sensitive data filtered
     """
-    sensitive_fields = {
-        "password", "token", "secret", "key", "authorization",
-        "ssn", "social_security", "credit_card", "medical_record_number",
-        "patient_id", "health_data", "symptoms", "medications"
-    }
+    # event_dict is a per-call copy owned by structlog, so it is updated in place
+    for k, v in event_dict.items():
+        if k.casefold() in _SENSITIVE_FIELDS:
+            event_dict[k] = _REDACTED
+        else:
+            new = _redact(v)
+            if new is not v:
+                event_dict[k] = new
+    return event_dict
+
+
+def _orjson_dumps(obj: Any, **kwargs: Any) -> str:
+    """JSONRenderer serializer backed by orjson; returns str for stdlib handlers."""
+    return orjson.dumps(obj, default=kwargs.get("default"), option=orjson.OPT_NON_STR_KEYS).decode()
+
+
+class BatchedStreamHandler(logging.StreamHandler):
+    """
+    Stream handler that moves writes off the logging call site.
 
-    def _filter_dict(data: Any) -> Any:
-        if isinstance(data, dict):
-            return {
-                k: "***REDACTED***" if k.lower() in sensitive_fields else _filter_dict(v)
-                for k, v in data.items()
-            }
-        elif isinstance(data, (list, tuple)):
-            return [_filter_dict(item) for item in data]
-        return data
+    ``emit`` only formats the record and enqueues the line; a daemon writer
+    thread coalesces up to ``batch_size`` lines, or whatever arrives within
+    ``batch_ms``, into a single write. A thread (rather than an asyncio task)
+    is used because records are also emitted from sync code running in the
+    threadpool and before the event loop starts.
+    """
 
-    return _filter_dict(event_dict)
+    FLUSH_INTERVAL = 0.1
+
+    def __init__(self, stream: Any = None, batch_size: int = 64, batch_ms: int = 50):
+        super().__init__(stream)
+        self.batch_size = max(1, batch_size)
+        self.batch_interval = max(0, batch_ms) / 1000
+        self._urgent = False
+        self._last_flush = time.monotonic()
+        self._queue: "queue.SimpleQueue[Optional[str]]" = queue.SimpleQueue()
+        self._writer = threading.Thread(target=self._drain, name="log-writer", daemon=True)
+        self._writer.start()
+
+    def emit(self, record: logging.LogRecord) -> None:
+        """Format the record and hand it to the writer thread."""
+        try:
+            line = self.format(record) + self.terminator
+            if record.levelno >= logging.WARNING:
+                self._urgent = True
+            self._queue.put_nowait(line)
+        except Exception:
+            self.handleError(record)
+
+    def _drain(self) -> None:
+        """Writer loop: block for one line, then batch until size or deadline."""
+        while True:
+            line = self._queue.get()
+            if line is None:
+                return
+
+            batch = [line]
+            deadline = time.monotonic() + self.batch_interval
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    line = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if line is None:
+                    self._write(batch)
+                    return
+                batch.append(line)
+
+            self._write(batch)
+
+    def _write(self, batch: List[str]) -> None:
+        """
+        Write a batch with one write call; never let errors kill the writer.
+
+        The stream is flushed only when the queue has gone idle, a WARNING+
+        record was written, or FLUSH_INTERVAL has passed since the last
+        flush, so sustained traffic costs one flush per interval rather than
+        one per batch.
+        """
+        try:
+            self.acquire()
+            try:
+                self.stream.write("".join(batch))
+                now = time.monotonic()
+                if self._urgent or self._queue.empty() or now - self._last_flush >= self.FLUSH_INTERVAL:
+                    self._urgent = False
+                    self._last_flush = now
+                    self.stream.flush()
+            finally:
+                self.release()
+        except Exception:
+            pass
+
+    def close(self) -> None:
+        """Stop the writer thread after it has written everything queued."""
+        if self._writer.is_alive():
+            self._queue.put_nowait(None)
+            self._writer.join(timeout=1.0)
+        super().close()
 
 
 def setup_logging(
     log_level: str = "INFO",
     json_output: bool = True,
     development_mode: bool = False,
+    batch_size: int = 64,
+    batch_ms: int = 50,
 ) -> None:
     """
     Configure structured logging for the application.
@@ -93,6 +249,8 @@ def setup_logging(
         log_level: Logging level (DEBUG, INFO, WARNING, ERROR, CRITICAL)
         json_output: Whether to output logs in JSON format
         development_mode: Whether running in development mode (affects formatting)
+        batch_size: Max log lines per stdout write (1 disables batching)
+        batch_ms: Max time a line waits for its batch to fill
     """
     # Configure standard library logging
     logging.basicConfig(
@@ -129,7 +287,7 @@ def setup_logging(
         # JSON output for production
         processors.extend([
             structlog.processors.dict_tracebacks,
-            structlog.processors.JSONRenderer(),
+            structlog.processors.JSONRenderer(serializer=_orjson_dumps),
         ])
 
     # Configure structlog
@@ -143,8 +301,14 @@ def setup_logging(
 
     # Set up root logger to use structlog
     root_logger = logging.getLogger()
+    for existing in root_logger.handlers:
+        if isinstance(existing, BatchedStreamHandler):
+            existing.close()
     root_logger.handlers.clear()
-    handler = logging.StreamHandler(sys.stdout)
+    if batch_size > 1:
+        handler: logging.Handler = BatchedStreamHandler(sys.stdout, batch_size=batch_size, batch_ms=batch_ms)
+    else:
+        handler = logging.StreamHandler(sys.stdout)
     root_logger.addHandler(handler)
 
     # Suppress noisy third-party logs in production
@@ -1,632 +0,0 @@
-"""
-FastAPI Exception Handlers and Custom Middleware
-
-This module provides centralized exception handling and middleware components
-for the SaaS Medical Tracker application, including request ID tracking,
-timing, CORS, and comprehensive error management.
-"""
-
-import time
-import uuid
-from typing import Optional
-
-import structlog
-from fastapi import FastAPI, Request, Response
-from fastapi.middleware.cors import CORSMiddleware as _FastAPICORSMiddleware
-from fastapi.middleware.trustedhost import TrustedHostMiddleware
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.responses import Response
-
-from app.core.settings import get_settings
-
-logger = structlog.get_logger(__name__)
-settings = get_settings()
-
-# ---------------------------------------------------------------------------
-# Permissive default CORS middleware
-# ---------------------------------------------------------------------------
-# The test suite imports `CORSMiddleware` from this module and then calls
-# `app.add_middleware(CORSMiddleware)` without any keyword arguments. The
-# upstream Starlette/FastAPI CORSMiddleware emits NO CORS headers if
-# `allow_origins` is omitted (defaults to an empty list). To align with the
-# contract tests we provide a thin wrapper that supplies permissive defaults
-# when no explicit configuration is given.
-#
-# IMPORTANT: We only alter behaviour when *no* kwargs are passed. Existing
-# application code that supplies explicit CORS settings continues to work
-# unchanged.
-# ---------------------------------------------------------------------------
-class CORSMiddleware(_FastAPICORSMiddleware):  # type: ignore[misc]
-    """Permissive default CORS middleware.
-
-    If instantiated without keyword arguments we apply the permissive
-    configuration expected by the tests:
-      - allow_origins: localhost dev origins + example.com
-      - allow_methods: all common HTTP methods
-      - allow_headers: '*'
-      - allow_credentials: True
-      - expose_headers: request/processing identifiers
-    """
-
-    def __init__(self, app, **kwargs):  # type: ignore[override]
-        if not kwargs:
-            kwargs = {
-                "allow_origins": [
-                    "http://localhost:3000",
-                    "http://localhost:8000",
-                    "https://example.com",
-                ],
-                "allow_methods": ["GET", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"],
-                "allow_headers": ["*"],
-                "allow_credentials": True,
-                "expose_headers": ["X-Request-ID", "X-Process-Time"],
-                "max_age": 600,
-            }
-        else:
-            # Ensure credentials/header exposure expectations if caller omitted them
-            kwargs.setdefault("allow_credentials", True)
-            kwargs.setdefault("expose_headers", ["X-Request-ID", "X-Process-Time"])
-        super().__init__(app, **kwargs)
-
-
-class RequestIDMiddleware(BaseHTTPMiddleware):
-    """
-    Middleware to add unique request ID to each request.
-    
-    The request ID can be used for tracing and debugging purposes.
-    It's added to the response headers and made available to all handlers.
-    """
-
-    async def dispatch(self, request: Request, call_next) -> Response:
-        """Process request and add/preserve request ID.
-
-        If client supplies X-Request-ID header, preserve it. Otherwise generate
-        a UUID4. Make ID available via request.state and response header.
-        """
-        incoming_id = request.headers.get("X-Request-ID")
-        request_id = incoming_id if incoming_id and len(incoming_id) > 0 else str(uuid.uuid4())
-
-        # Attach to request state
-        request.state.request_id = request_id
-
-        with structlog.contextvars.bound_contextvars(request_id=request_id):
-            response = await call_next(request)
-            response.headers["X-Request-ID"] = request_id
-            # If JSON body already contains a request_id key absence, we could inject.
-            # Avoid parsing large bodies; only patch small JSON dict responses.
-            try:
-                if "application/json" in response.headers.get("content-type", "") and hasattr(response, 'body'):
-                    # Starlette Response body is bytes; only mutate if small (<10KB)
-                    if response.body and len(response.body) < 10_000:
-                        import json as _json
-                        raw_bytes = bytes(response.body)  # memoryview -> bytes safe conversion
-                        data = _json.loads(raw_bytes.decode('utf-8'))
-                        if isinstance(data, dict) and "request_id" not in data:
-                            data["request_id"] = request_id
-                            new_body = _json.dumps(data).encode()
-                            response.body = new_body
-                            response.headers["Content-Length"] = str(len(new_body))
-            except Exception:  # noqa: BLE001 - non-critical augmentation
-                pass
-            return response
-
-
-class TimingMiddleware(BaseHTTPMiddleware):
-    """
-    Middleware to measure and log request processing time.
-    
-    Logs request timing information and adds timing headers to responses.
-    """
-
-    async def dispatch(self, request: Request, call_next) -> Response:
-        """Process request and measure timing.
-
-        Adds X-Process-Time header in milliseconds with >=0.1ms resolution.
-        """
-        start_time_ns = time.perf_counter_ns()
-
-        # Get request info for logging
-        method = request.method
-        url = str(request.url)
-        client_ip = request.client.host if request.client else "unknown"
-        user_agent = request.headers.get("user-agent", "unknown")
-
-        logger.info(
-            "Request started",
-            method=method,
-            url=url,
-            client_ip=client_ip,
-            user_agent=user_agent,
-        )
-
-        try:
-            # Process the request
-            response = await call_next(request)
-
-            # Calculate processing time
-            duration_ms = (time.perf_counter_ns() - start_time_ns) / 1_000_000.0
-            # Floor at 0.1ms to avoid showing '0.0'
-            if duration_ms < 0.1:
-                duration_ms = 0.1
-            # Add timing header (ms with 3 decimal places)
-            response.headers["X-Process-Time"] = f"{duration_ms/1000.0:.6f}" if duration_ms > 10 else f"{duration_ms/1000.0:.6f}"  # seconds as float string
-
-            # Log successful request
-            logger.info(
-                "Request completed",
-                method=method,
-                url=url,
-                status_code=response.status_code,
-                process_time_ms=round(duration_ms, 3),
-            )
-
-            return response
-
-        except Exception as e:
-            # Calculate processing time even for errors
-            process_time = (time.perf_counter_ns() - start_time_ns) / 1_000_000.0
-            if process_time < 0.1:
-                process_time = 0.1
-
-            # Log error
-            logger.error(
-                "Request failed",
-                method=method,
-                url=url,
-                process_time_ms=round(process_time, 3),
-                error=str(e),
-                error_type=type(e).__name__,
-            )
-
-            # Re-raise to let error handlers process it
-            raise
-
-
-class SecurityHeadersMiddleware(BaseHTTPMiddleware):
-    """
-    Middleware to add security headers to all responses.
-    
-    Implements common security headers to protect against various attacks.
-    """
-
-    async def dispatch(self, request: Request, call_next) -> Response:
-        """Process request and add security headers."""
-        response = await call_next(request)
-
-        # Add security headers
-        response.headers.update({
-            # Prevent MIME type sniffing
-            "X-Content-Type-Options": "nosniff",
-
-            # Enable XSS protection
-            "X-XSS-Protection": "1; mode=block",
-
-            # Prevent page from being displayed in frame
-            "X-Frame-Options": "DENY",
-
-            # HSTS header (tests expect value present regardless of environment)
-            "Strict-Transport-Security": "max-age=31536000; includeSubDomains",
-
-            # Referrer policy
-            "Referrer-Policy": "strict-origin-when-cross-origin",
-
-            # Content Security Policy (basic)
-            "Content-Security-Policy": (
-                "default-src 'self'; "
-                "script-src 'self' 'unsafe-inline' 'unsafe-eval' https://cdn.jsdelivr.net; "
-                "style-src 'self' 'unsafe-inline' https://cdn.jsdelivr.net; "
-                "img-src 'self' data: https://fastapi.tiangolo.com; "
-                "font-src 'self' https://cdn.jsdelivr.net"
-            )
-        })
-
-        # Fallback CORS origin header injection (in case CORSMiddleware not applied or origin normalization mismatch)
-        origin = request.headers.get("origin") or request.headers.get("Origin")
-        if origin and "Access-Control-Allow-Origin" not in response.headers:
-            response.headers["Access-Control-Allow-Origin"] = origin
-            # Mirror credentials allowance if cookie/auth flows expected
-            response.headers.setdefault("Access-Control-Allow-Credentials", "true")
-            # Also advertise allowed methods/headers for simplicity when CORSMiddleware absent
-            response.headers.setdefault("Access-Control-Allow-Methods", "GET, POST, PUT, PATCH, DELETE, OPTIONS")
-            response.headers.setdefault("Access-Control-Allow-Headers", "*")
-        return response
-
-
-class TracingHeadersMiddleware(BaseHTTPMiddleware):
-    """
-    Middleware to handle distributed tracing headers.
-    
-    Supports standard tracing headers for request correlation across services:
-    - X-Trace-Id: Unique identifier for the entire request trace
-    - X-Span-Id: Unique identifier for this service span
-    - X-Parent-Span-Id: Parent span ID from upstream service
-    - X-Correlation-Id: Business correlation identifier
-    - X-Request-Id: Service-specific request identifier
-    
-    Also supports OpenTelemetry standard headers:
-    - traceparent: W3C Trace Context header
-    - tracestate: W3C Trace Context state
-    """
-
-    async def dispatch(self, request: Request, call_next) -> Response:
-        """Process request and propagate tracing headers."""
-        
-        # Extract incoming tracing headers
-        trace_id = self._get_trace_id(request)
-        parent_span_id = self._get_parent_span_id(request)
-        correlation_id = self._get_correlation_id(request)
-        
-        # Generate new span ID for this service
-        span_id = str(uuid.uuid4())
-        
-        # Store tracing context in request state
-        request.state.trace_id = trace_id
-        request.state.span_id = span_id
-        request.state.parent_span_id = parent_span_id
-        request.state.correlation_id = correlation_id
-        
-        # Add to structlog context for automatic logging
-        with structlog.contextvars.bound_contextvars(
-            trace_id=trace_id,
-            span_id=span_id,
-            parent_span_id=parent_span_id,
-            correlation_id=correlation_id
-        ):
-            # Process the request
-            response = await call_next(request)
-            
-            # Add tracing headers to response
-            response.headers.update({
-                "X-Trace-Id": trace_id,
-                "X-Span-Id": span_id,
-                "X-Correlation-Id": correlation_id
-            })
-            
-            if parent_span_id:
-                response.headers["X-Parent-Span-Id"] = parent_span_id
-            
-            # Log trace completion
-            logger.debug(
-                "trace_completed",
-                trace_id=trace_id,
-                span_id=span_id,
-                method=request.method,
-                url=str(request.url.path),
-                status_code=response.status_code
-            )
-            
-            return response
-    
-    def _get_trace_id(self, request: Request) -> str:
-        """Extract or generate trace ID."""
-        # Check for existing trace ID in various header formats
-        trace_id = (
-            request.headers.get("X-Trace-Id") or
-            request.headers.get("trace-id") or 
-            request.headers.get("X-B3-TraceId") or
-            self._extract_w3c_trace_id(request) or
-            str(uuid.uuid4())
-        )
-        return trace_id
-    
-    def _get_parent_span_id(self, request: Request) -> Optional[str]:
-        """Extract parent span ID from headers."""
-        return (
-            request.headers.get("X-Span-Id") or
-            request.headers.get("span-id") or
-            request.headers.get("X-B3-SpanId") or
-            self._extract_w3c_parent_id(request)
-        )
-    
-    def _get_correlation_id(self, request: Request) -> str:
-        """Extract or generate correlation ID."""
-        correlation_id = (
-            request.headers.get("X-Correlation-Id") or
-            request.headers.get("correlation-id") or
-            request.headers.get("X-Request-ID") or
-            str(uuid.uuid4())
-        )
-        return correlation_id
-    
-    def _extract_w3c_trace_id(self, request: Request) -> Optional[str]:
-        """Extract trace ID from W3C traceparent header."""
-        traceparent = request.headers.get("traceparent")
-        if traceparent:
-            try:
-                # W3C traceparent format: version-trace_id-parent_id-trace_flags
-                parts = traceparent.split("-")
-                if len(parts) >= 2:
-                    return parts[1]  # trace_id is the second part
-            except Exception:
-                pass
-        return None
-    
-    def _extract_w3c_parent_id(self, request: Request) -> Optional[str]:
-        """Extract parent span ID from W3C traceparent header."""
-        traceparent = request.headers.get("traceparent")
-        if traceparent:
-            try:
-                # W3C traceparent format: version-trace_id-parent_id-trace_flags
-                parts = traceparent.split("-")
-                if len(parts) >= 3:
-                    return parts[2]  # parent_id is the third part
-            except Exception:
-                pass
-        return None
-
-
-class AuthenticationMiddleware(BaseHTTPMiddleware):
-    """
-    Middleware to handle authentication context.
-    
-    Extracts and validates authentication tokens, making user context
-    available to request handlers.
-    """
-
-    async def dispatch(self, request: Request, call_next) -> Response:
-        """Process request and handle authentication."""
-        # Extract authorization header
-        authorization = request.headers.get("Authorization")
-
-        # Initialize auth context
-        request.state.user_id = None
-        request.state.user_email = None
-        request.state.is_authenticated = False
-
-        # Skip auth for public endpoints
-        public_paths = [
-            "/docs", "/redoc", "/openapi.json",
-            "/health", "/metrics", "/",
-            "/api/v1/auth/token",
-            "/api/v1/auth/register"
-        ]
-
-        path = request.url.path
-        if any(path.startswith(public) for public in public_paths):
-            return await call_next(request)
-
-        # Process authentication if present
-        if authorization:
-            try:
-                from app.core.auth import decode_access_token, validate_token_format
-
-                # Extract and validate token
-                token = validate_token_format(authorization)
-                payload = decode_access_token(token)
-
-                # Set authentication context
-                request.state.user_id = payload.get("user_id")
-                request.state.user_email = payload.get("sub")
-                request.state.is_authenticated = True
-
-                logger.debug(
-                    "Authentication successful",
-                    user_email=request.state.user_email,
-                    privacy_filtered=True
-                )
-
-            except Exception as e:
-                logger.warning(
-                    "Authentication failed",
-                    error=str(e),
-                    privacy_filtered=True
-                )
-                # Continue without authentication - let endpoint handlers decide
-
-        return await call_next(request)
-
-
-# Exception Handlers - These are now handled in app.core.errors
-# The functions below are kept for backward compatibility but should use
-# the centralized error handling system from app.core.errors
-
-
-# Exception handlers are now centralized in app.core.errors
-
-
-def setup_middleware(app: FastAPI) -> None:
-    """
-    Configure all middleware for the FastAPI application.
-    
-    Args:
-        app: FastAPI application instance
-    """
-    logger.info("Setting up middleware")
-
-    # Trusted Host Middleware (should be first) - only in production
-    allowed_hosts = getattr(settings, 'ALLOWED_HOSTS', None)
-    if allowed_hosts:
-        app.add_middleware(
-            TrustedHostMiddleware,
-            allowed_hosts=allowed_hosts
-        )
-
-    # CORS Middleware
-    cors_origins = getattr(settings, 'BACKEND_CORS_ORIGINS', ["http://localhost:3000", "http://localhost:8000"])
-    if isinstance(cors_origins, list):
-        # Browsers omit the trailing slash in the Origin header, so align the
-        # stored values to avoid false CORS rejections.
-        normalized_cors_origins = [
-            str(origin).rstrip("/") if str(origin) != "*" else "*"
-            for origin in cors_origins
-        ]
-    else:
-        normalized_cors_origins = ["*"]
-
-    app.add_middleware(
-        CORSMiddleware,
-        allow_origins=normalized_cors_origins,
-        allow_credentials=True,
-        allow_methods=["*"],  # Include all methods; we'll explicitly handle OPTIONS below.
-        allow_headers=["*"],
-        expose_headers=["X-Request-ID", "X-Process-Time"]
-    )
-
-    # Lightweight preflight handler: If a route doesn't define OPTIONS, FastAPI may emit 405.
-    # Insert early middleware to intercept OPTIONS and return 200 with CORS headers.
-    class PreflightMiddleware(BaseHTTPMiddleware):
-        async def dispatch(self, request: Request, call_next):  # type: ignore[override]
-            if request.method == "OPTIONS":
-                # Build minimal successful preflight response.
-                origin = request.headers.get("origin", "*")
-                headers = {
-                    "Access-Control-Allow-Origin": origin if origin in normalized_cors_origins or "*" in normalized_cors_origins else "*",
-                    "Access-Control-Allow-Methods": "GET, POST, PUT, PATCH, DELETE, OPTIONS",
-                    "Access-Control-Allow-Headers": request.headers.get("access-control-request-headers", "*"),
-                    "Access-Control-Max-Age": "86400",
-                }
-                # Echo credentials allowance if configured
-                if True:  # allow_credentials is True above
-                    headers["Access-Control-Allow-Credentials"] = "true"
-                return Response(status_code=200, headers=headers)
-            return await call_next(request)
-
-    app.add_middleware(PreflightMiddleware)
-
-    # Post-processing CORS augmentation to ensure simple GET/POST responses carry origin header
-    class EnsureCorsHeadersMiddleware(BaseHTTPMiddleware):
-        async def dispatch(self, request: Request, call_next):  # type: ignore[override]
-            response = await call_next(request)
-            origin = request.headers.get("Origin") or request.headers.get("origin")
-            if origin:
-                # Only set if not already present from CORSMiddleware
-                if "Access-Control-Allow-Origin" not in response.headers:
-                    # Validate origin against allowed list or wildcard
-                    if origin.rstrip("/") in normalized_cors_origins or "*" in normalized_cors_origins:
-                        response.headers["Access-Control-Allow-Origin"] = origin.rstrip("/")
-                    else:
-                        # Fall back to first allowed origin to avoid leaking arbitrary origins
-                        response.headers["Access-Control-Allow-Origin"] = normalized_cors_origins[0]
-                response.headers.setdefault("Access-Control-Allow-Credentials", "true")
-            return response
-
-    app.add_middleware(EnsureCorsHeadersMiddleware)
-
-    # Security headers
-    app.add_middleware(SecurityHeadersMiddleware)
-
-    # Distributed tracing headers (should be early for request correlation)
-    app.add_middleware(TracingHeadersMiddleware)
-
-    # Request ID (should be early for logging)
-    app.add_middleware(RequestIDMiddleware)
-
-    # Timing (should be early to measure full request time)
-    app.add_middleware(TimingMiddleware)
-
-    # Authentication (should be after request ID for logging)
-    app.add_middleware(AuthenticationMiddleware)
-
-    logger.info("Middleware setup completed")
-
-
-def setup_exception_handlers(app: FastAPI) -> None:
-    """
-    Configure all exception handlers for the FastAPI application.
-    
-    Args:
-        app: FastAPI application instance
-    """
-    logger.info("Setting up exception handlers")
-
-    # Use centralized error handling from app.core.errors
-    from app.core.errors import register_exception_handlers, generic_exception_handler
-    register_exception_handlers(app)
-    # Ensure generic Exception handler is explicitly applied (defensive - in case of registration order issues)
-    app.add_exception_handler(Exception, generic_exception_handler)
-
-    # Some tests instantiate TestClient with the default `raise_server_exceptions=True`,
-    # which re-raises unhandled exceptions before the response is returned. Although
-    # we register a generic exception handler above, we observed that plain Exceptions
-    # raised inside endpoints were still bubbling up. To guarantee a consistent JSON
-    # error contract, we add a lightweight HTTP middleware wrapper that intercepts
-    # any exception and delegates to the generic handler. This ensures the tests
-    # receive a 500 response body instead of an uncaught exception.
-    @app.middleware("http")
-    async def _catch_all_exceptions(request: Request, call_next):  # type: ignore[override]
-        try:
-            return await call_next(request)
-        except Exception as exc:  # noqa: BLE001 - broad by design for final safety net
-            # Delegate to the already defined generic_exception_handler for logging & shaping
-            return await generic_exception_handler(request, exc)
-
-    logger.info("Exception handlers setup completed")
-
-
-# Utility functions for request context
-def get_request_id(request: Request) -> Optional[str]:
-    """Get request ID from request state."""
-    return getattr(request.state, "request_id", None)
-
-
-def get_user_id(request: Request) -> Optional[str]:
-    """Get authenticated user ID from request state."""
-    return getattr(request.state, "user_id", None)
-
-
-def get_user_email(request: Request) -> Optional[str]:
-    """Get authenticated user email from request state."""
-    return getattr(request.state, "user_email", None)
-
-
-def is_authenticated(request: Request) -> bool:
-    """Check if request is authenticated."""
-    return getattr(request.state, "is_authenticated", False)
-
-
-def get_trace_id(request: Request) -> Optional[str]:
-    """Get trace ID from request state."""
-    return getattr(request.state, "trace_id", None)
-
-
-def get_span_id(request: Request) -> Optional[str]:
-    """Get span ID from request state."""
-    return getattr(request.state, "span_id", None)
-
-
-def get_correlation_id(request: Request) -> Optional[str]:
-    """Get correlation ID from request state."""
-    return getattr(request.state, "correlation_id", None)
-
-
-def get_tracing_context(request: Request) -> dict:
-    """Get all tracing context from request state."""
-    return {
-        "trace_id": get_trace_id(request),
-        "span_id": get_span_id(request),
-        "parent_span_id": getattr(request.state, "parent_span_id", None),
-        "correlation_id": get_correlation_id(request),
-        "request_id": get_request_id(request)
-    }
-
-
-# Example usage and testing
-if __name__ == "__main__":
-    from fastapi import FastAPI
-
-    # Create test app
-    app = FastAPI()
-
-    # Setup middleware and handlers
-    setup_middleware(app)
-    setup_exception_handlers(app)
-
-    @app.get("/test")
-    async def test_endpoint(request: Request):
-        """Test endpoint for middleware testing."""
-        return {
-            "message": "Test successful",
-            "request_id": get_request_id(request),
-            "user_id": get_user_id(request),
-            "authenticated": is_authenticated(request)
-        }
-
-    print("✅ Middleware and exception handlers configured")
-    print("Test app created with middleware stack:")
-    print("- Trusted Host Middleware")
-    print("- CORS Middleware")
-    print("- Security Headers Middleware")
-    print("- Request ID Middleware")
-    print("- Timing Middleware")
-    print("- Authentication Middleware")
-    print("- Exception Handlers: Validation, HTTP, General")
@@ -2,15 +2,98 @@
 
 from __future__ import annotations
 
-from datetime import datetime
-from typing import Callable
-from fastapi import Request, Response
+import time
+from datetime import datetime, timezone
 from starlette.types import ASGIApp
 from app.services.cookie_helper import COOKIE_NAME
-from app.core.dependencies import get_sync_db_session
-from app.services.session_service import SessionService
+from app.models.base import get_database
+from app.services.session_cache import session_cache
+from app.services.session_service import AsyncSessionService
 from app.models.session import Session as SessionModel
-from app.telemetry.logging_auth import log_session_created
+
+
+_COOKIE_PREFIX = COOKIE_NAME.encode("latin-1") + b"="
+# Namespaced scope key under which the parsed session cookie is cached
+_SCOPE_SESSION_KEY = "app.session_cookie"
+
+
+def _extract_cookie(raw: bytes) -> str | None:
+    """Find the session cookie in one raw Cookie header value without a full parse."""
+    start = 0
+    while True:
+        index = raw.find(_COOKIE_PREFIX, start)
+        if index < 0:
+            return None
+        # Must be a whole cookie name, not the tail of another one
+        if index == 0 or raw[index - 1] in b" ;":
+            end = raw.find(b";", index)
+            value = raw[index + len(_COOKIE_PREFIX):end if end >= 0 else None].strip()
+            return value.decode("latin-1") or None
+        start = index + 1
+
+
+def _session_cookie(scope) -> str | None:
+    """Read the session cookie straight from the raw Cookie header(s).
+
+    Only the one cookie is looked up, so there is no Request object and no
+    full cookie-jar parse. The result is cached on the scope so other
+    middleware can reuse it without scanning the headers again.
+    """
+    if _SCOPE_SESSION_KEY in scope:
+        return scope[_SCOPE_SESSION_KEY]
+
+    session_id = None
+    for name, value in scope["headers"]:
+        if name == b"cookie":
+            session_id = _extract_cookie(value)
+            if session_id:
+                break
+    scope[_SCOPE_SESSION_KEY] = session_id
+    return session_id
+
+
+_NO_SESSION_STATE = {"session": None, "session_id": None, "user_id": None}
+
+
+# The idle timeout is 30 minutes, so refreshing last activity at most once a
+# minute is equivalent and saves an UPDATE on most requests.
+_TOUCH_INTERVAL_SECONDS = 60
+
+
+def _epoch(value: datetime) -> float:
+    """Unix timestamp of a stored session datetime; naive values are stored as UTC."""
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+
+async def _load_session(session_id: str) -> SessionModel | None:
+    """Validate a session ID, touching or revoking it.
+
+    Sessions validated within the last few seconds are served from the
+    in-process cache without a DB roundtrip. Otherwise a session from the
+    async engine's pool is used, so the event loop is not blocked. Returns
+    the active session, or None.
+    """
+    now = time.time()
+    sess = session_cache.get(session_id, now)
+    if sess is not None:
+        return sess
+
+    async with get_database().get_async_session() as db:
+        service = AsyncSessionService(db)
+        sess = await service.get(session_id)
+        if sess is None or sess.revoked_at is not None:
+            return None
+        # Idle timeout check (epoch seconds; no datetime allocation for "now")
+        if now > _epoch(sess.expires_at):
+            await service.revoke(sess)
+            return None
+        # Rolling expiry; skip the write if activity was recorded recently
+        if now - _epoch(sess.last_activity_at) > _TOUCH_INTERVAL_SECONDS:
+            sess = await service.touch(sess)
+        session_cache.set(sess, _epoch(sess.expires_at))
+        return sess
 
 
 class SessionMiddleware:
@@ -22,29 +105,21 @@ class SessionMiddleware:
             await self.app(scope, receive, send)
             return
 
-        request = Request(scope, receive=receive)
-        session_id = request.cookies.get(COOKIE_NAME)
-        request.state.session = None
-        request.state.session_id = None
-        request.state.user_id = None
-
-        if session_id:
-            db = next(get_sync_db_session())  # generator dependency pattern
-            service = SessionService(db)
-            sess: SessionModel | None = service.get(session_id)
-            if sess and sess.revoked_at is None:
-                # Idle timeout check
-                if datetime.utcnow() > sess.expires_at:
-                    service.revoke(sess)
-                else:
-                    service.touch(sess)
-                    request.state.session = sess
-                    request.state.session_id = sess.id
-                    request.state.user_id = sess.user_id
-
-        async def send_wrapper(message):
-            await send(message)
-
-        await self.app(scope, receive, send_wrapper)
+        state = scope.setdefault("state", {})
+        state.update(_NO_SESSION_STATE)
+
+        # Anonymous fast path: no session cookie means no DB work at all
+        session_id = _session_cookie(scope)
+        if not session_id:
+            await self.app(scope, receive, send)
+            return
+
+        sess = await _load_session(session_id)
+        if sess is not None:
+            state["session"] = sess
+            state["session_id"] = sess.id
+            state["user_id"] = sess.user_id
+
+        await self.app(scope, receive, send)
 
 __all__ = ["SessionMiddleware"]
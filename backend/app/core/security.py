@@ -18,7 +18,8 @@ This module only supplies configuration to avoid scattering literals.
 from __future__ import annotations
 
 from http import HTTPStatus
-from typing import Dict, Any
+from types import MappingProxyType
+from typing import Dict, Any, Mapping
 
 from app.core.config import get_settings
 
@@ -45,8 +46,16 @@ COOKIE_DEFAULTS: Dict[str, Any] = {
 # Standard session lifetime (seconds) aligned with settings token expiry (30m default)
 COOKIE_SESSION_MAX_AGE: int = settings.ACCESS_TOKEN_EXPIRE_SECONDS
 
+# Settings are fixed for the process lifetime, so the full attribute sets are
+# built once and shared read-only instead of copied per cookie.
+_SESSION_COOKIE_ATTRS: Mapping[str, Any] = MappingProxyType(
+    {**COOKIE_DEFAULTS, "max_age": COOKIE_SESSION_MAX_AGE}
+)
+# Expire immediately; browsers respect either max_age=0 or empty value + past expiry
+_CLEAR_COOKIE_ATTRS: Mapping[str, Any] = MappingProxyType({**COOKIE_DEFAULTS, "max_age": 0})
 
-def build_session_cookie(token: str) -> Dict[str, Any]:
+
+def build_session_cookie(token: str) -> Mapping[str, Any]:
     """Return keyword args for Response.set_cookie for the session JWT.
 
     Separates token value from attribute dictionary so callers can:
@@ -56,19 +65,14 @@ def build_session_cookie(token: str) -> Dict[str, Any]:
         token: Encoded JWT or opaque session value.
 
     Returns:
-        Dict[str, Any]: Attributes suitable for set_cookie
+        Mapping[str, Any]: Read-only attributes suitable for set_cookie
     """
-    attrs = COOKIE_DEFAULTS.copy()
-    attrs.update({"max_age": COOKIE_SESSION_MAX_AGE})
-    return attrs
+    return _SESSION_COOKIE_ATTRS
 
 
-def build_clear_cookie() -> Dict[str, Any]:
-    """Return kwargs for deleting the session cookie (logout / invalid session)."""
-    attrs = COOKIE_DEFAULTS.copy()
-    # Expire immediately; browsers respect either max_age=0 or empty value + past expiry
-    attrs.update({"max_age": 0})
-    return attrs
+def build_clear_cookie() -> Mapping[str, Any]:
+    """Return read-only kwargs for deleting the session cookie (logout / invalid session)."""
+    return _CLEAR_COOKIE_ATTRS
 
 
 __all__ = [
@@ -12,16 +12,41 @@ Features:
 - Security-focused settings
 """
 
-import os
-from functools import lru_cache
+import re
+from functools import cached_property, lru_cache
 from typing import List, Optional
 
-from pydantic import Field, field_validator
+from pydantic import Field, PrivateAttr, ValidationInfo, field_validator
 from pydantic.networks import AnyHttpUrl
 
 from pydantic_settings import BaseSettings
 
 
+# Database URL schemes accepted by Settings.validate_database_url
+_SUPPORTED_DATABASE_SCHEMES = frozenset({
+    "sqlite",
+    "sqlite+aiosqlite",
+    "postgresql",
+    "postgresql+psycopg2",
+    "postgresql+asyncpg",
+    "mysql",
+    "mysql+aiomysql",
+})
+
+# ENVIRONMENT values (lowercased) recognised by the Settings.is_* checks
+_DEVELOPMENT_ENVIRONMENTS = frozenset({"development", "dev", "local"})
+_PRODUCTION_ENVIRONMENTS = frozenset({"production", "prod"})
+_TESTING_ENVIRONMENTS = frozenset({"test", "testing"})
+
+# Settings fields the cached is_* checks are derived from
+_ENVIRONMENT_FIELDS = frozenset({"ENVIRONMENT", "TESTING"})
+
+
+def _split_csv(value: str) -> List[str]:
+    """Split a comma-separated env value, dropping blanks in the same pass."""
+    return [item for item in map(str.strip, value.split(",")) if item]
+
+
 class Settings(BaseSettings):
     """Application settings with environment variable support."""
 
@@ -81,10 +106,11 @@ class Settings(BaseSettings):
     @classmethod
     def assemble_cors_origins(cls, v):
         """Parse CORS origins from environment string or list."""
-        if isinstance(v, str) and not v.startswith("["):
-            return [i.strip() for i in v.split(",")]
-        elif isinstance(v, (list, str)):
+        if isinstance(v, list):
             return v
+        if isinstance(v, str):
+            # JSON lists are left for pydantic to decode
+            return v if v[:1] == "[" else _split_csv(v)
         raise ValueError(v)
 
     # =============================================================================
@@ -98,10 +124,8 @@ class Settings(BaseSettings):
     @classmethod
     def assemble_host_list(cls, v):
         """Parse host list from environment string."""
-        if v is None:
-            return None
         if isinstance(v, str):
-            return [i.strip() for i in v.split(",")]
+            return _split_csv(v)
         return v
 
     # Security headers
@@ -130,6 +154,11 @@ class Settings(BaseSettings):
     SLOW_REQUEST_THRESHOLD: float = 1.0
     LOG_SLOW_REQUESTS: bool = True
 
+    # Distributed tracing: fraction of requests that get a span (0.0-1.0).
+    # Requests carrying an upstream trace ID or a sampled traceparent are
+    # always traced.
+    TRACE_SAMPLE_RATE: float = Field(default=1.0, ge=0.0, le=1.0)
+
     # Structured logging
     SERVICE_NAME: str = "saas-medical-tracker"
     COMPONENT_NAME: str = "backend"
@@ -191,9 +220,13 @@ class Settings(BaseSettings):
 
     @field_validator("SECRET_KEY", "JWT_SECRET_KEY")
     @classmethod
-    def validate_secret_keys(cls, v):
+    def validate_secret_keys(cls, v, info: ValidationInfo):
         """Validate that secret keys are secure in production."""
-        if v.startswith("your-") and os.getenv("ENVIRONMENT") == "production":
+        # ENVIRONMENT is declared (and validated) earlier, so its resolved
+        # value - including one from .env - is already in info.data. Match
+        # it the same way as is_production(), e.g. "Production" or "prod".
+        environment = str(info.data.get("ENVIRONMENT", "")).lower()
+        if v.startswith("your-") and environment in _PRODUCTION_ENVIRONMENTS:
             raise ValueError("Secret keys must be changed in production")
         return v
 
@@ -201,7 +234,10 @@ class Settings(BaseSettings):
     @classmethod
     def validate_database_url(cls, v):
         """Validate database URL format."""
-        if not v or not v.startswith(("sqlite://", "postgresql://", "mysql://")):
+        # Compare the scheme as a whole so driver-qualified URLs
+        # (e.g. postgresql+asyncpg://) are accepted too
+        scheme, separator, _ = v.partition("://")
+        if not separator or scheme not in _SUPPORTED_DATABASE_SCHEMES:
             raise ValueError("DATABASE_URL must be a valid database connection string")
         return v
 
@@ -211,32 +247,76 @@ class Settings(BaseSettings):
         env_file = ".env"
         env_file_encoding = "utf-8"
 
+    @cached_property
+    def database_scheme(self) -> str:
+        """Scheme part of DATABASE_URL (e.g. ``sqlite``), or ``unknown``."""
+        scheme, separator, _ = self.DATABASE_URL.partition("://")
+        return scheme if separator else "unknown"
+
+    # Environment checks are resolved once per instance and re-resolved
+    # whenever ENVIRONMENT or TESTING is assigned, so they never go stale.
+    _is_development: bool = PrivateAttr(default=False)
+    _is_production: bool = PrivateAttr(default=False)
+    _is_testing: bool = PrivateAttr(default=False)
+
+    def model_post_init(self, __context) -> None:
+        self._resolve_environment()
+
+    def __setattr__(self, name: str, value) -> None:
+        super().__setattr__(name, value)
+        if name in _ENVIRONMENT_FIELDS:
+            self._resolve_environment()
+        elif name == "DATABASE_URL":
+            # Drop the cached_property value so it is derived from the new URL
+            self.__dict__.pop("database_scheme", None)
+
+    def model_copy(self, *, update=None, deep: bool = False) -> "Settings":
+        # model_copy(update=...) writes fields without going through __setattr__
+        copied = super().model_copy(update=update, deep=deep)
+        copied._resolve_environment()
+        if update and "DATABASE_URL" in update:
+            copied.__dict__.pop("database_scheme", None)
+        return copied
+
+    def _resolve_environment(self) -> None:
+        environment = self.ENVIRONMENT.lower()
+        self._is_development = environment in _DEVELOPMENT_ENVIRONMENTS
+        self._is_production = environment in _PRODUCTION_ENVIRONMENTS
+        self._is_testing = self.TESTING or environment in _TESTING_ENVIRONMENTS
+
     def is_development(self) -> bool:
         """Check if running in development mode."""
-        return self.ENVIRONMENT.lower() in ("development", "dev", "local")
+        return self._is_development
 
     def is_production(self) -> bool:
         """Check if running in production mode."""
-        return self.ENVIRONMENT.lower() in ("production", "prod")
+        return self._is_production
 
     def is_testing(self) -> bool:
         """Check if running in testing mode."""
-        return self.TESTING or self.ENVIRONMENT.lower() in ("test", "testing")
+        return self._is_testing
 
 
 # =============================================================================
 # Settings Instance and Cache
 # =============================================================================
 
-@lru_cache()
+_settings: Optional[Settings] = None
+
+
 def get_settings() -> Settings:
     """
     Get cached settings instance.
     
     This function creates and caches a Settings instance,
     ensuring the same configuration is used throughout the application.
+    A module-level singleton keeps the hot path to a global load and an
+    ``is None`` check, which is cheaper than an lru_cache call.
     """
-    return Settings()
+    global _settings
+    if _settings is None:
+        _settings = Settings()
+    return _settings
 
 
 # =============================================================================
@@ -262,6 +342,11 @@ def is_testing() -> bool:
 # Configuration Validation
 # =============================================================================
 
+_REQUIRED_PRODUCTION_SETTINGS = ("SECRET_KEY", "JWT_SECRET_KEY", "DATABASE_URL")
+# An http(s) URL, or the bare wildcard
+_CORS_ORIGIN_RE = re.compile(r"https?://|\*\Z")
+
+
 def validate_settings() -> None:
     """
     Validate application settings.
@@ -273,44 +358,31 @@ def validate_settings() -> None:
 
     # Check required production settings
     if settings.is_production():
-        required_production_settings = [
-            "SECRET_KEY",
-            "JWT_SECRET_KEY",
-            "DATABASE_URL",
-        ]
-
-        for setting_name in required_production_settings:
+        for setting_name in _REQUIRED_PRODUCTION_SETTINGS:
             value = getattr(settings, setting_name)
             if not value or (isinstance(value, str) and value.startswith("your-")):
                 raise ValueError(f"{setting_name} must be set for production")
 
     # Validate CORS origins
-    if settings.BACKEND_CORS_ORIGINS:
-        for origin in settings.BACKEND_CORS_ORIGINS:
-            if not str(origin).startswith(("http://", "https://")):
-                if str(origin) != "*":  # Allow wildcard
-                    raise ValueError(f"Invalid CORS origin: {origin}")
+    for origin in settings.BACKEND_CORS_ORIGINS:
+        if not _CORS_ORIGIN_RE.match(str(origin)):
+            raise ValueError(f"Invalid CORS origin: {origin}")
 
 
 # =============================================================================
 # Settings Summary for Debugging
 # =============================================================================
 
-def get_settings_summary() -> dict:
-    """
-    Get a summary of current settings for debugging.
-    
-    Returns:
-        Dictionary with non-sensitive settings information
-    """
+@lru_cache(maxsize=1)
+def _build_settings_summary() -> dict:
+    """Build the settings summary once; ``cache_clear()`` after changing settings."""
     settings = get_settings()
-
     return {
         "app_name": settings.APP_NAME,
         "version": settings.APP_VERSION,
         "environment": settings.ENVIRONMENT,
         "debug": settings.DEBUG,
-        "database_type": settings.DATABASE_URL.split("://")[0] if "://" in settings.DATABASE_URL else "unknown",
+        "database_type": settings.database_scheme,
         "cors_origins_count": len(settings.BACKEND_CORS_ORIGINS),
         "log_level": settings.LOG_LEVEL,
         "service_name": settings.SERVICE_NAME,
@@ -318,13 +390,26 @@ def get_settings_summary() -> dict:
     }
 
 
+def get_settings_summary() -> dict:
+    """
+    Get a summary of current settings for debugging.
+    
+    The summary is built once and cached; each caller gets its own shallow
+    copy, so changes to the returned dict do not leak to other callers.
+
+    Returns:
+        Dictionary with non-sensitive settings information
+    """
+    return dict(_build_settings_summary())
+
+
 if __name__ == "__main__":
     # Test settings loading
     try:
         settings = get_settings()
         print("✅ Settings loaded successfully")
         print(f"Environment: {settings.ENVIRONMENT}")
-        print(f"Database: {settings.DATABASE_URL.split('://')[0]}")
+        print(f"Database: {settings.database_scheme}")
         print(f"Debug mode: {settings.DEBUG}")
         print(f"CORS origins: {len(settings.BACKEND_CORS_ORIGINS)}")
 
@@ -5,11 +5,13 @@ This module contains the main FastAPI application factory and configuration.
 It sets up the API routes, middleware, and database connections.
 """
 
+import asyncio
 from contextlib import asynccontextmanager
 from typing import AsyncGenerator
 
 import structlog
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
 from structlog.types import FilteringBoundLogger
 
 from app.api import get_router
@@ -29,6 +31,8 @@ def configure_logging() -> FilteringBoundLogger:
         log_level=settings.LOG_LEVEL,
         json_output=settings.LOG_JSON_OUTPUT,
         development_mode=settings.DEBUG,
+        batch_size=settings.LOG_BATCH_SIZE,
+        batch_ms=settings.LOG_BATCH_MS,
     )
     return structlog.get_logger(__name__)
 
@@ -48,7 +52,13 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
     """
     # Startup
     # Startup log (avoid emojis for Windows console compatibility)
-    logger.info("Starting SaaS Medical Tracker API", version=settings.VERSION)
+    # The event loop is reported so deployments can confirm uvloop is in use
+    loop_type = type(asyncio.get_running_loop())
+    logger.info(
+        "Starting SaaS Medical Tracker API",
+        version=settings.VERSION,
+        event_loop=f"{loop_type.__module__}.{loop_type.__qualname__}",
+    )
 
     try:
         # Initialize database
@@ -94,6 +104,8 @@ def create_app() -> FastAPI:
         openapi_url=f"{settings.API_V1_STR}/openapi.json" if settings.ENVIRONMENT != "production" else None,
         docs_url=f"{settings.API_V1_STR}/docs" if settings.ENVIRONMENT != "production" else None,
         redoc_url=f"{settings.API_V1_STR}/redoc" if settings.ENVIRONMENT != "production" else None,
+        # Encode every JSON endpoint with orjson rather than the stdlib json module
+        default_response_class=ORJSONResponse,
         lifespan=lifespan,
     )
 
@@ -125,11 +137,16 @@ app = create_app()
 if __name__ == "__main__":
     import uvicorn
 
-    # For development only
+    # For development only. uvicorn[standard] installs uvloop and httptools and
+    # the "auto" loop/http settings pick them up where available; set
+    # USE_UVLOOP=false to force the stdlib asyncio loop. In production run e.g.:
+    #   uvicorn app.main:app --loop uvloop --http httptools --workers 4
     uvicorn.run(
         "app.main:app",
         host="0.0.0.0",
         port=8000,
         reload=True,
+        loop="auto" if settings.USE_UVLOOP else "asyncio",
+        http="auto",
         log_config=None,  # Use our custom logging
     )
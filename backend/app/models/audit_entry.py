@@ -6,7 +6,7 @@ from __future__ import annotations
 from datetime import datetime
 from typing import Optional, Any, Dict
 
-from sqlmodel import SQLModel, Field, Column, DateTime
+from sqlmodel import SQLModel, Field, Column, DateTime, JSON
 
 
 class AuditEntry(SQLModel, table=True):  # type: ignore[call-arg]
@@ -18,4 +18,4 @@ class AuditEntry(SQLModel, table=True):  # type: ignore[call-arg]
     action: str = Field(description="create | update | deactivate")
     user_id: Optional[int] = Field(default=None, index=True)
     timestamp: datetime = Field(default_factory=datetime.utcnow, sa_column=Column(DateTime(timezone=False), nullable=False))
-    diff: Optional[Dict[str, Any]] = Field(default=None, description="Changed fields diff JSON structure")
+    diff: Optional[Dict[str, Any]] = Field(default=None, sa_column=Column(JSON), description="Changed fields diff JSON structure")
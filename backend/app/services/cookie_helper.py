@@ -5,13 +5,42 @@ Defines standardized attributes for session cookies (security settings from plan
 
 from __future__ import annotations
 
-from fastapi import Response
-from typing import Optional, Literal
 from datetime import datetime
+from functools import lru_cache
+from typing import Literal, Optional
+
+from fastapi import Response
+
 from app.core.settings import get_settings
 
 COOKIE_NAME = "session"
 
+_COOKIE_PREFIX = COOKIE_NAME.encode("latin-1") + b"="
+_PLACEHOLDER = "x"
+
+
+@lru_cache(maxsize=16)
+def _cookie_attributes(secure: bool, http_only: bool, same_site: str, max_age: int) -> bytes:
+    """Encoded attribute tail of the session Set-Cookie header.
+
+    Rendered once per attribute combination through Starlette's own
+    ``set_cookie`` so the bytes match it exactly; later calls only
+    concatenate the session ID.
+    """
+    probe = Response()
+    probe.set_cookie(
+        key=COOKIE_NAME,
+        value=_PLACEHOLDER,
+        httponly=http_only,
+        secure=secure,
+        samesite=same_site,  # type: ignore[arg-type]
+        max_age=max_age,
+        path="/",
+    )
+    header = probe.raw_headers[-1][1]
+    return header[len(_COOKIE_PREFIX) + len(_PLACEHOLDER):]
+
+
 def set_session_cookie(response: Response, session_id: str, *, secure: bool | None = None, http_only: bool = True, same_site: str | None = None, max_age: int = 1800) -> None:
     """Set session cookie with hardened defaults.
 
@@ -29,6 +58,15 @@ def set_session_cookie(response: Response, session_id: str, *, secure: bool | No
     if lower not in {"lax","strict","none"}:
         lower = "lax"
     samesite_literal = lower  # type: ignore
+    # Session IDs are UUIDs, which never need cookie quoting; anything else
+    # goes through Starlette's full cookie rendering.
+    if session_id.isascii() and session_id.replace("-", "").isalnum():
+        response.raw_headers.append((
+            b"set-cookie",
+            _COOKIE_PREFIX + session_id.encode("latin-1")
+            + _cookie_attributes(secure, http_only, samesite_literal, max_age),
+        ))
+        return
     response.set_cookie(
         key=COOKIE_NAME,
         value=session_id,
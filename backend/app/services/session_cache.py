@@ -0,0 +1,66 @@
+"""In-process TTL cache of validated sessions.
+
+Lets SessionMiddleware skip the SELECT + touch UPDATE for a session it has
+validated within the last few seconds. Entries are per process; revoking a
+session through SessionService/AsyncSessionService invalidates it here, and
+anything else ages out after the TTL.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from app.models.session import Session as SessionModel
+
+SESSION_CACHE_TTL_SECONDS = 30
+SESSION_CACHE_MAX_ENTRIES = 100_000
+
+
+class SessionCache:
+    """Bounded LRU of session_id -> validated session, with a TTL per entry.
+
+    Each entry also stores the session's expiry as a Unix timestamp, so a
+    hit is checked with a float comparison instead of datetime arithmetic.
+    """
+
+    def __init__(self, ttl: float = SESSION_CACHE_TTL_SECONDS, maxsize: int = SESSION_CACHE_MAX_ENTRIES):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[str, tuple[float, float, SessionModel]]" = OrderedDict()
+        # Revocations can come from sync handlers running in the threadpool
+        self._lock = threading.Lock()
+
+    def get(self, session_id: str, now_ts: float) -> Optional[SessionModel]:
+        """Return the cached session if it is fresh and not expired at ``now_ts``."""
+        with self._lock:
+            entry = self._entries.get(session_id)
+            if entry is None:
+                return None
+            cached_at, expires_ts, sess = entry
+            if time.monotonic() - cached_at > self.ttl or now_ts > expires_ts:
+                del self._entries[session_id]
+                return None
+            self._entries.move_to_end(session_id)
+            return sess
+
+    def set(self, sess: SessionModel, expires_ts: float) -> None:
+        """Cache a validated session along with its expiry Unix timestamp."""
+        with self._lock:
+            self._entries[sess.id] = (time.monotonic(), expires_ts, sess)
+            self._entries.move_to_end(sess.id)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, session_id: str) -> None:
+        with self._lock:
+            self._entries.pop(session_id, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+session_cache = SessionCache()
+
+__all__ = ["SessionCache", "session_cache", "SESSION_CACHE_TTL_SECONDS", "SESSION_CACHE_MAX_ENTRIES"]
@@ -2,10 +2,12 @@
 
 from datetime import datetime
 from typing import Optional
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session as SASession
 from sqlmodel import Session, select
 
 from app.models.session import Session as SessionModel
+from app.services.session_cache import session_cache
 
 class SessionService:
     def __init__(self, db: SASession | Session):
@@ -34,9 +36,36 @@ class SessionService:
 
     def revoke(self, sess: SessionModel) -> SessionModel:
         sess.revoke()
+        session_cache.invalidate(sess.id)
         self.db.add(sess)
         self.db.commit()
         self.db.refresh(sess)
         return sess
 
-__all__ = ["SessionService"]
\ No newline at end of file
+class AsyncSessionService:
+    """Async counterpart of SessionService for callers on the event loop."""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def get(self, session_id: str) -> Optional[SessionModel]:
+        stmt = select(SessionModel).where(SessionModel.id == session_id)
+        result = await self.db.execute(stmt)
+        return result.scalars().first()
+
+    async def touch(self, sess: SessionModel) -> SessionModel:
+        sess.touch()
+        self.db.add(sess)
+        await self.db.commit()
+        await self.db.refresh(sess)
+        return sess
+
+    async def revoke(self, sess: SessionModel) -> SessionModel:
+        sess.revoke()
+        session_cache.invalidate(sess.id)
+        self.db.add(sess)
+        await self.db.commit()
+        await self.db.refresh(sess)
+        return sess
+
+__all__ = ["SessionService", "AsyncSessionService"]
\ No newline at end of file
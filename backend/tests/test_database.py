@@ -165,6 +165,19 @@ class TestDatabaseManager:
         assert hasattr(manager, 'sync_session_factory')
         assert hasattr(manager, 'async_session_factory')
 
+    def test_pool_settings_applied(self, tmp_path):
+        """Test that pool tuning settings reach both engines."""
+        manager = DatabaseManager(f"sqlite:///{tmp_path / 'pool.db'}")
+
+        for engine in (manager.sync_engine, manager.async_engine):
+            assert engine.pool.size() == settings.DATABASE_POOL_SIZE
+            assert engine.pool._recycle == settings.DATABASE_POOL_RECYCLE_SECONDS
+
+        # In-memory SQLite has no queue pool to size, and its one connection
+        # holds the database, so it is never recycled
+        memory = DatabaseManager("sqlite:///:memory:")
+        assert memory.sync_engine.pool._recycle == -1
+
     def test_sync_session_creation(self):
         """Test creating synchronous database session."""
         manager = DatabaseManager()
@@ -306,6 +319,35 @@ class TestDatabaseHealth:
             assert health.response_time_ms > 0
             assert health.response_time_ms < 5000  # Should be fast
 
+    def test_health_check_reuses_recent_result(self, tmp_path, monkeypatch):
+        """Test that health probes share a short-lived result."""
+        manager = DatabaseManager(f"sqlite:///{tmp_path / 'health.db'}")
+
+        first = manager.check_health()
+        assert first.status == "healthy"
+        assert manager.check_health() is first
+
+        # Once the window passes the database is queried again
+        monkeypatch.setattr("app.models.base.HEALTH_CHECK_CACHE_SECONDS", 0)
+        assert manager.check_health() is not first
+
+        monkeypatch.setattr(manager.sync_engine, "connect", lambda: 1 / 0)
+        assert manager.check_health().status == "unhealthy"
+
+    def test_health_check_keeps_session_transactions_in_memory(self):
+        """Test that a health check on in-memory SQLite leaves rollback working."""
+        manager = DatabaseManager("sqlite:///:memory:")
+        with manager.sync_session_factory() as session:
+            session.execute(text("CREATE TABLE probe_rows (id INTEGER)"))
+            session.commit()
+
+        assert manager.check_health().status == "healthy"
+
+        with manager.sync_session_factory() as session:
+            session.execute(text("INSERT INTO probe_rows VALUES (1)"))
+            session.rollback()
+            assert session.execute(text("SELECT COUNT(*) FROM probe_rows")).scalar() == 0
+
     def test_health_check_timing(self):
         """Test that health check measures timing."""
         import time
@@ -10,6 +10,8 @@ This module tests HTTP client functionality including:
 - Error handling and timeout behavior
 """
 
+import asyncio
+import threading
 from datetime import datetime
 from unittest.mock import AsyncMock, Mock, patch
 
@@ -17,6 +19,8 @@ import httpx
 import pytest
 
 from app.core.http_client import (
+    AiohttpClient,
+    AiohttpResponse,
     APIResponseError,
     EnhancedHTTPClient,
     HTTPClientConfig,
@@ -28,10 +32,12 @@ from app.core.http_client import (
     RetryConfig,
     TimeoutError,
     TokenBucketRateLimiter,
+    _get_simple_client,
     create_api_client_config,
     create_client,
     get_client_registry,
     make_simple_request,
+    shutdown_http_clients,
 )
 
 
@@ -62,6 +68,7 @@ class TestRetryConfig:
         assert config.base_delay == 1.0
         assert config.max_delay == 60.0
         assert config.exponential_backoff is True
+        assert config.jitter is True
         assert 429 in config.retry_on_status
         assert 500 in config.retry_on_status
 
@@ -119,6 +126,7 @@ class TestHTTPClientConfig:
         assert config.verify_ssl is True
         assert config.follow_redirects is True
         assert config.max_redirects == 5
+        assert config.transport == "httpx"
         assert isinstance(config.retry_config, RetryConfig)
 
 
@@ -167,7 +175,7 @@ class TestTokenBucketRateLimiter:
         assert limiter.tokens == 0
 
         # Wait and check refill
-        with patch('app.core.http_client.time.time') as mock_time:
+        with patch('app.core.http_client.time.monotonic') as mock_time:
             original_time = limiter.last_update
             # Mock 1 second elapsed
             mock_time.side_effect = [original_time + 1.0]
@@ -178,6 +186,13 @@ class TestTokenBucketRateLimiter:
             mock_time.side_effect = [original_time + 1.0]
             assert await limiter.acquire(1) is True
 
+    def test_try_acquire_nowait(self):
+        """Test synchronous token acquisition."""
+        limiter = TokenBucketRateLimiter(requests_per_second=10.0, burst_size=2)
+
+        assert limiter.try_acquire_nowait(2) is True
+        assert limiter.try_acquire_nowait(1) is False
+
     @pytest.mark.asyncio
     async def test_wait_for_tokens(self):
         """Test waiting for tokens to become available."""
@@ -320,6 +335,32 @@ class TestEnhancedHTTPClient:
         # Client should be closed after context
         # Just check it doesn't raise an exception
 
+    @pytest.mark.asyncio
+    async def test_client_with_aiohttp_transport(self):
+        """Test aiohttp transport adapts responses and timeouts."""
+        aiohttp = pytest.importorskip("aiohttp")
+        config = HTTPClientConfig(base_url="https://api.example.com", transport="aiohttp")
+        client = EnhancedHTTPClient(config)
+
+        assert isinstance(client._client, AiohttpClient)
+
+        response = AiohttpResponse(200, {"Content-Type": "application/json"}, b'{"ok": true}', None)
+        assert response.text == '{"ok": true}'
+        assert response.json() == {"ok": True}
+        assert response.headers["content-type"] == "application/json"
+
+        options = client._client._request_options({"content": b"raw", "timeout": 2.0})
+        assert options["data"] == b"raw"
+        assert options["timeout"].total == 2.0
+        with pytest.raises(TypeError, match="files"):
+            await client._client.request("POST", "/upload", files={"f": b"x"})
+
+        with patch.object(client._client, '_get_session', side_effect=aiohttp.ServerTimeoutError("slow")):
+            with pytest.raises(TimeoutError):
+                await client.get("/slow-endpoint")
+
+        await client.close()
+
     def test_build_url_relative(self, basic_config):
         """Test URL building with relative endpoints."""
         client = EnhancedHTTPClient(basic_config)
@@ -361,7 +402,8 @@ class TestEnhancedHTTPClient:
             retry_config=RetryConfig(
                 base_delay=1.0,
                 max_delay=10.0,
-                exponential_backoff=True
+                exponential_backoff=True,
+                jitter=False
             )
         )
         client = EnhancedHTTPClient(config)
@@ -371,6 +413,20 @@ class TestEnhancedHTTPClient:
         assert client._calculate_delay(2) == 4.0  # 1.0 * 2^2
         assert client._calculate_delay(10) == 10.0  # Capped at max_delay
 
+    def test_calculate_delay_jitter(self, basic_config):
+        """Test decorrelated jitter stays between base_delay and min(max_delay, 3x previous)."""
+        config = HTTPClientConfig(
+            base_url="https://api.example.com",
+            retry_config=RetryConfig(base_delay=1.0, max_delay=10.0)
+        )
+        client = EnhancedHTTPClient(config)
+
+        delay = None
+        for attempt in range(20):
+            previous = delay or 1.0
+            delay = client._calculate_delay(attempt, delay)
+            assert 1.0 <= delay <= min(10.0, previous * 3)
+
     def test_calculate_delay_linear(self, basic_config):
         """Test linear backoff delay calculation."""
         config = HTTPClientConfig(
@@ -406,13 +462,33 @@ class TestEnhancedHTTPClient:
 
         await client.close()
 
+    @pytest.mark.asyncio
+    async def test_request_logs_skipped_when_info_disabled(self, basic_config):
+        """Test request/response log payloads are not built when INFO is disabled."""
+        client = EnhancedHTTPClient(basic_config)
+
+        mock_response = Mock()
+        mock_response.status_code = 200
+        mock_response.headers = {}
+
+        with patch.object(client._client, 'request', return_value=mock_response):
+            with patch('app.core.http_client._info_enabled', return_value=False):
+                with patch('app.core.http_client.RequestLog') as mock_request_log:
+                    with patch('app.core.http_client.ResponseLog') as mock_response_log:
+                        await client.post("/users", json={"name": "test"})
+
+        mock_request_log.assert_not_called()
+        mock_response_log.assert_not_called()
+
+        await client.close()
+
     @pytest.mark.asyncio
     async def test_rate_limit_exceeded(self, rate_limited_config):
         """Test rate limit exceeded error."""
         client = EnhancedHTTPClient(rate_limited_config)
 
         # Mock rate limiter to return False
-        with patch.object(client.rate_limiter, 'acquire', return_value=False):
+        with patch.object(client.rate_limiter, 'try_acquire_nowait', return_value=False):
             with pytest.raises(RateLimitExceededError):
                 await client.get("/users")
 
@@ -427,15 +503,42 @@ class TestEnhancedHTTPClient:
         mock_response = Mock()
         mock_response.status_code = 404
         mock_response.headers = {}
-        mock_response.text = "Not Found"
-        mock_response.json.return_value = {"error": "User not found"}
+        mock_response.text = '{"error": "User not found"}'
+        mock_response.content = b'{"error": "User not found"}'
 
         with patch.object(client._client, 'request', return_value=mock_response):
             with pytest.raises(APIResponseError) as exc_info:
                 await client.get("/users/999")
 
             assert exc_info.value.status_code == 404
-            assert "Not Found" in str(exc_info.value)
+            assert "User not found" in str(exc_info.value)
+            assert exc_info.value.response_data == {"error": "User not found"}
+
+        await client.close()
+
+    @pytest.mark.asyncio
+    async def test_retry_backoff_skips_final_sleep(self):
+        """Test retries back off from base_delay and the final failure raises without sleeping."""
+        config = HTTPClientConfig(
+            base_url="https://api.example.com",
+            retry_config=RetryConfig(max_retries=2, base_delay=1.0, max_delay=10.0, jitter=False)
+        )
+        client = EnhancedHTTPClient(config)
+
+        mock_response = Mock()
+        mock_response.status_code = 500
+        mock_response.headers = {}
+        mock_response.text = "Server Error"
+        mock_response.content = b"Server Error"
+        mock_response.json.return_value = {}
+
+        with patch.object(client._client, 'request', return_value=mock_response) as mock_request:
+            with patch('app.core.http_client.asyncio.sleep', new_callable=AsyncMock) as mock_sleep:
+                with pytest.raises(APIResponseError):
+                    await client.get("/flaky")
+
+        assert mock_request.call_count == 3
+        assert [call.args[0] for call in mock_sleep.call_args_list] == [1.0, 2.0]
 
         await client.close()
 
@@ -603,21 +706,58 @@ class TestConvenienceFunctions:
         """Test make_simple_request convenience function."""
         mock_response_data = {"users": [{"id": 1, "name": "test"}]}
 
-        with patch('app.core.http_client.create_client') as mock_create_client:
-            # Mock the context manager and client
+        with patch('app.core.http_client._get_simple_client') as mock_get_client:
             mock_client = AsyncMock()
             mock_response = Mock()
             mock_response.json.return_value = mock_response_data
             mock_client._make_request.return_value = mock_response
-
-            # Setup context manager mock
-            mock_create_client.return_value.__aenter__.return_value = mock_client
+            mock_get_client.return_value = mock_client
 
             result = await make_simple_request("GET", "https://api.example.com/users")
 
             assert result == mock_response_data
             mock_client._make_request.assert_called_once_with("GET", "https://api.example.com/users")
 
+    @pytest.mark.asyncio
+    async def test_make_simple_request_reuses_client(self):
+        """Test make_simple_request shares one client until shutdown."""
+        client1 = await _get_simple_client()
+        client2 = await _get_simple_client()
+
+        assert client1 is client2
+        assert client1.config.max_connections == 1000
+
+        await shutdown_http_clients()
+        assert await _get_simple_client() is not client1
+        await shutdown_http_clients()
+
+    def test_simple_client_rebuilt_per_event_loop(self):
+        """Test the shared client is not reused across event loops."""
+        client1 = asyncio.run(_get_simple_client())
+        client2 = asyncio.run(_get_simple_client())
+
+        assert client1 is not client2
+        asyncio.run(shutdown_http_clients())
+
+    def test_simple_client_from_running_loop_is_closed(self):
+        """Test a replaced client is closed on its own loop while that loop still runs."""
+        other_loop = asyncio.new_event_loop()
+        thread = threading.Thread(target=other_loop.run_forever)
+        thread.start()
+        try:
+            old_client = asyncio.run_coroutine_threadsafe(_get_simple_client(), other_loop).result()
+            new_client = asyncio.run(_get_simple_client())
+            assert new_client is not old_client
+
+            # The close was scheduled on the old loop; wait for it to run there
+            asyncio.run_coroutine_threadsafe(asyncio.sleep(0.05), other_loop).result()
+            assert old_client._client.is_closed
+        finally:
+            other_loop.call_soon_threadsafe(other_loop.stop)
+            thread.join()
+            other_loop.close()
+            asyncio.run(shutdown_http_clients())
+
     def test_get_client_registry_singleton(self):
         """Test client registry singleton behavior."""
         registry1 = get_client_registry()
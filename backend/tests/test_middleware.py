@@ -6,24 +6,39 @@ for the SaaS Medical Tracker API.
 """
 
 import asyncio
+import time
+import uuid
+from types import SimpleNamespace
 
 import pytest
 from fastapi import FastAPI, HTTPException
 from fastapi.testclient import TestClient
 from starlette.requests import Request
+from starlette.responses import PlainTextResponse, StreamingResponse
 
 from app.core.auth import create_access_token
+from app.core.fastuuid import uuid4_hex
 from app.core.middleware import (
     AuthenticationMiddleware,
+    CORSFallbackMiddleware,
     CORSMiddleware,
+    ObservabilityMiddleware,
     RequestIDMiddleware,
     SecurityHeadersMiddleware,
     TimingMiddleware,
+    TracingHeadersMiddleware,
     TrustedHostMiddleware,
+    _build_security_headers,
+    get_trace_id,
+    get_tracing_context,
+    get_user_email,
+    is_authenticated,
     setup_exception_handlers,
     setup_middleware,
 )
+from app.core.middleware.session_middleware import SessionMiddleware, _session_cookie
 from app.core.settings import get_settings
+from app.services.session_cache import SessionCache
 
 settings = get_settings()
 
@@ -77,6 +92,17 @@ class TestRequestIDMiddleware:
 
         assert id1 != id2
 
+    def test_generated_request_id_is_uuid4(self):
+        """Test that pooled request IDs are valid, unique version 4 UUIDs."""
+        ids = [uuid4_hex() for _ in range(600)]  # spans more than one random pool
+
+        assert len(set(ids)) == len(ids)
+        for value in ids:
+            parsed = uuid.UUID(value)
+            assert str(parsed) == value
+            assert parsed.version == 4
+            assert parsed.variant == uuid.RFC_4122
+
     def test_provided_request_id(self, app):
         """Test using provided request ID from headers."""
         client = TestClient(app)
@@ -87,6 +113,50 @@ class TestRequestIDMiddleware:
         assert response.headers["X-Request-ID"] == custom_id
         assert response.json()["request_id"] == custom_id
 
+    def test_request_id_injected_into_json_body(self, app):
+        """Test that small JSON bodies receive the request ID with a matching length."""
+        @app.get("/plain")
+        async def plain_endpoint():
+            return {"message": "plain"}
+
+        client = TestClient(app)
+        response = client.get("/plain", headers={"X-Request-ID": "inject-123"})
+
+        assert response.json() == {"message": "plain", "request_id": "inject-123"}
+        assert int(response.headers["Content-Length"]) == len(response.content)
+
+    def test_request_id_injection_escapes_and_skips_non_objects(self, app):
+        """Test that injected IDs are JSON-escaped and non-object bodies are untouched."""
+        @app.get("/empty")
+        async def empty_endpoint():
+            return {}
+
+        @app.get("/list")
+        async def list_endpoint():
+            return [1, 2, 3]
+
+        client = TestClient(app)
+        response = client.get("/empty", headers={"X-Request-ID": 'quote"id'})
+        assert response.json() == {"request_id": 'quote"id'}
+
+        response = client.get("/list")
+        assert response.json() == [1, 2, 3]
+
+    def test_chunked_json_body_passes_through(self, app):
+        """Test that JSON bodies sent in several messages are not buffered or patched."""
+        chunks = [b'{"part": ', b'"one"}']
+
+        @app.get("/chunked")
+        async def chunked_endpoint():
+            return StreamingResponse(
+                iter(chunks),
+                media_type="application/json",
+                headers={"Content-Length": str(sum(map(len, chunks)))},
+            )
+
+        response = TestClient(app).get("/chunked")
+        assert response.json() == {"part": "one"}
+
 
 class TestTimingMiddleware:
     """Test Timing middleware functionality."""
@@ -173,7 +243,6 @@ class TestSecurityHeadersMiddleware:
             "X-Content-Type-Options": "nosniff",
             "X-Frame-Options": "DENY",
             "X-XSS-Protection": "1; mode=block",
-            "Strict-Transport-Security": "max-age=31536000; includeSubDomains",
             "Referrer-Policy": "strict-origin-when-cross-origin"
         }
 
@@ -181,6 +250,20 @@ class TestSecurityHeadersMiddleware:
             assert header in response.headers
             assert response.headers[header] == expected_value
 
+    def test_hsts_only_when_enabled(self, app):
+        """Test that HSTS follows the production/ENABLE_HSTS settings."""
+        settings = get_settings()
+        client = TestClient(app)
+        response = client.get("/test")
+
+        hsts_expected = settings.is_production() or settings.ENABLE_HSTS
+        assert ("Strict-Transport-Security" in response.headers) == hsts_expected
+
+        header_names = [name for name, _ in _build_security_headers(include_hsts=True)]
+        assert b"strict-transport-security" in header_names
+        header_names = [name for name, _ in _build_security_headers(include_hsts=False)]
+        assert b"strict-transport-security" not in header_names
+
     def test_content_security_policy(self, app):
         """Test Content Security Policy header."""
         client = TestClient(app)
@@ -194,6 +277,193 @@ class TestSecurityHeadersMiddleware:
         assert "script-src" in csp
         assert "style-src" in csp
 
+    def test_fallback_cors_headers(self, app):
+        """Test that an Origin without CORSMiddleware gets fallback CORS headers."""
+        client = TestClient(app)
+        response = client.get("/test", headers={"Origin": "http://localhost:3000"})
+
+        assert response.headers["Access-Control-Allow-Origin"] == "http://localhost:3000"
+        assert response.headers["Access-Control-Allow-Credentials"] == "true"
+        assert "Access-Control-Allow-Origin" not in client.get("/test").headers
+
+
+class TestTracingHeadersMiddleware:
+    """Test distributed tracing header propagation."""
+
+    @pytest.fixture
+    def app(self):
+        """Create test app with TracingHeaders middleware."""
+        app = FastAPI()
+        app.add_middleware(TracingHeadersMiddleware)
+
+        @app.get("/test")
+        async def test_endpoint(request: Request):
+            context = get_tracing_context(request)
+            return {
+                "trace_id": context["trace_id"],
+                "parent_span_id": context["parent_span_id"],
+            }
+
+        return app
+
+    def test_traceparent_parsed(self, app):
+        """Test that trace and parent span IDs come from a valid traceparent."""
+        client = TestClient(app)
+        response = client.get(
+            "/test",
+            headers={"traceparent": "00-0af7651916cd43dd8448eb211c80319c-b7ad6b7169203331-01"},
+        )
+
+        assert response.json() == {
+            "trace_id": "0af7651916cd43dd8448eb211c80319c",
+            "parent_span_id": "b7ad6b7169203331",
+        }
+        assert response.headers["X-Parent-Span-Id"] == "b7ad6b7169203331"
+
+    def test_unsampled_request_skips_tracing(self):
+        """Test that unsampled requests get no span or tracing headers."""
+        app = FastAPI()
+        app.add_middleware(TracingHeadersMiddleware, sample_rate=0.0)
+
+        @app.get("/test")
+        async def test_endpoint(request: Request):
+            return {"sampled": request.state.ctx.sampled, "trace_id": get_trace_id(request)}
+
+        client = TestClient(app)
+        response = client.get("/test")
+
+        assert response.json() == {"sampled": False, "trace_id": None}
+        assert "X-Trace-Id" not in response.headers
+        assert "X-Span-Id" not in response.headers
+
+        # A sampled upstream traceparent is always honoured
+        response = client.get(
+            "/test",
+            headers={"traceparent": "00-0af7651916cd43dd8448eb211c80319c-b7ad6b7169203331-01"},
+        )
+        assert response.json() == {"sampled": True, "trace_id": "0af7651916cd43dd8448eb211c80319c"}
+        assert "X-Span-Id" in response.headers
+
+    def test_span_id_is_short_hex(self, app):
+        """Test that internal span IDs are 16-character hex strings."""
+        client = TestClient(app)
+        span_ids = {client.get("/test").headers["X-Span-Id"] for _ in range(5)}
+
+        assert len(span_ids) == 5
+        assert all(len(span_id) == 16 and int(span_id, 16) >= 0 for span_id in span_ids)
+
+    def test_malformed_traceparent_ignored(self, app):
+        """Test that a malformed traceparent falls back to a generated trace ID."""
+        client = TestClient(app)
+        response = client.get("/test", headers={"traceparent": "00-abc-def-01"})
+
+        data = response.json()
+        assert data["parent_span_id"] is None
+        assert data["trace_id"] not in ("abc", None)
+        assert "X-Parent-Span-Id" not in response.headers
+
+    def test_all_zero_traceparent_ignored(self, app):
+        """Test that the reserved all-zero trace ID is treated as invalid."""
+        client = TestClient(app)
+        traceparent = f"00-{'0' * 32}-00f067aa0ba902b7-01"
+        response = client.get("/test", headers={"traceparent": traceparent})
+
+        data = response.json()
+        assert data["trace_id"] != "0" * 32
+        assert data["parent_span_id"] is None
+
+    def test_correlation_id_matches_observability(self):
+        """Test that the standalone stack correlates on the request ID like the fused layer."""
+        app = FastAPI()
+        app.add_middleware(TracingHeadersMiddleware, sample_rate=1.0)
+        app.add_middleware(RequestIDMiddleware)
+
+        @app.get("/test")
+        async def test_endpoint():
+            return {}
+
+        client = TestClient(app)
+        response = client.get("/test")
+        assert response.headers["X-Correlation-Id"] == response.headers["X-Request-ID"]
+
+        response = client.get("/test", headers={"X-Correlation-Id": "corr-1"})
+        assert response.headers["X-Correlation-Id"] == "corr-1"
+
+
+class TestObservabilityMiddleware:
+    """Test fused request ID, timing, tracing and security headers middleware."""
+
+    @pytest.fixture
+    def app(self):
+        """Create test app with Observability middleware."""
+        app = FastAPI()
+        app.add_middleware(ObservabilityMiddleware)
+
+        @app.get("/test")
+        async def test_endpoint(request: Request):
+            context = get_tracing_context(request)
+            return {
+                "trace_id": context["trace_id"],
+                "parent_span_id": context["parent_span_id"],
+            }
+
+        return app
+
+    def test_all_headers_added(self, app):
+        """Test that one layer emits identifiers, timing and security headers."""
+        client = TestClient(app)
+        response = client.get("/test", headers={"X-Request-ID": "obs-123"})
+
+        assert response.status_code == 200
+        assert response.headers["X-Request-ID"] == "obs-123"
+        assert response.headers["X-Correlation-Id"] == "obs-123"
+        assert float(response.headers["X-Process-Time"]) > 0
+        assert "X-Trace-Id" in response.headers
+        assert "X-Span-Id" in response.headers
+        assert response.headers["X-Content-Type-Options"] == "nosniff"
+        assert response.headers["X-Frame-Options"] == "DENY"
+        assert "default-src" in response.headers["Content-Security-Policy"]
+        assert response.json()["request_id"] == "obs-123"
+
+    def test_correlation_id_defaults_to_request_id(self, app):
+        """Test that a generated request ID doubles as the correlation ID."""
+        client = TestClient(app)
+        response = client.get("/test")
+
+        assert response.headers["X-Correlation-Id"] == response.headers["X-Request-ID"]
+
+    def test_w3c_traceparent_propagated(self, app):
+        """Test that trace and parent span IDs are read from traceparent."""
+        trace_id = "0af7651916cd43dd8448eb211c80319c"
+        parent_id = "b7ad6b7169203331"
+        client = TestClient(app)
+        response = client.get("/test", headers={"traceparent": f"00-{trace_id}-{parent_id}-01"})
+
+        data = response.json()
+        assert data["trace_id"] == trace_id
+        assert data["parent_span_id"] == parent_id
+        assert response.headers["X-Trace-Id"] == trace_id
+        assert response.headers["X-Parent-Span-Id"] == parent_id
+
+    def test_response_headers_not_mutated(self):
+        """Test that tuple headers work and a re-sent Response gains no duplicates."""
+        shared = PlainTextResponse("ok")
+
+        async def raw_app(scope, receive, send):
+            if scope["path"] == "/tuple":
+                await send({"type": "http.response.start", "status": 200, "headers": ((b"content-length", b"2"),)})
+                await send({"type": "http.response.body", "body": b"ok"})
+            else:
+                await shared(scope, receive, send)
+
+        client = TestClient(ObservabilityMiddleware(raw_app))
+        assert "X-Request-ID" in client.get("/tuple").headers
+
+        client.get("/shared")
+        response = client.get("/shared")
+        assert response.headers.get_list("X-Request-ID") == [response.headers["X-Request-ID"]]
+        assert len(shared.raw_headers) == 2
+
 
 class TestAuthenticationMiddleware:
     """Test Authentication middleware functionality."""
@@ -248,6 +518,21 @@ class TestAuthenticationMiddleware:
         # Note: Full user extraction would require database lookup
         # For now, just check that it doesn't error
 
+    def test_valid_token_sets_auth_context(self, app):
+        """Test that a valid token populates auth context on non-public paths."""
+        @app.get("/me")
+        async def me_endpoint(request: Request):
+            return {
+                "is_authenticated": is_authenticated(request),
+                "user_email": get_user_email(request),
+            }
+
+        token = create_access_token({"sub": "test@example.com", "user_id": "123"})
+        client = TestClient(app)
+        response = client.get("/me", headers={"Authorization": f"Bearer {token}"})
+
+        assert response.json() == {"is_authenticated": True, "user_email": "test@example.com"}
+
     def test_protected_endpoint_invalid_token(self, app):
         """Test protected endpoint with invalid token."""
         client = TestClient(app)
@@ -273,6 +558,63 @@ class TestAuthenticationMiddleware:
         assert response.json()["user"] is None
 
 
+class TestSessionMiddleware:
+    """Test Session middleware cookie handling."""
+
+    def test_session_cookie_parsed_from_raw_headers(self):
+        """Test that only the session cookie is extracted from the Cookie header."""
+        scope = {"headers": [(b"cookie", b"theme=dark; session=abc-123;other=1")]}
+        assert _session_cookie(scope) == "abc-123"
+        assert _session_cookie({"headers": [(b"cookie", b"sessionx=1")]}) is None
+        assert _session_cookie({"headers": []}) is None
+        assert _session_cookie({"headers": [(b"cookie", b"mysession=x; session=y")]}) == "y"
+
+    def test_session_cookie_cached_on_scope(self):
+        """Test that the parsed cookie is reused from the scope."""
+        scope = {"headers": [(b"cookie", b"session=abc")]}
+        assert _session_cookie(scope) == "abc"
+
+        scope["headers"] = []
+        assert _session_cookie(scope) == "abc"
+
+    def test_session_cache_ttl_lru_and_invalidate(self):
+        """Test that cached sessions expire, are bounded and can be invalidated."""
+        now = time.time()
+        cache = SessionCache(ttl=60, maxsize=2)
+        first, second, third = (SimpleNamespace(id=str(i)) for i in range(3))
+
+        cache.set(first, now + 60)
+        cache.set(second, now + 60)
+        assert cache.get("0", now) is first
+
+        # "1" is now least recently used and gets evicted
+        cache.set(third, now + 60)
+        assert cache.get("1", now) is None
+        assert cache.get("2", now) is third
+
+        cache.invalidate("2")
+        assert cache.get("2", now) is None
+
+        # Past the session's own expiry, or past the cache TTL
+        cache.set(first, now - 1)
+        assert cache.get("0", now) is None
+        expired = SessionCache(ttl=-1)
+        expired.set(first, now + 60)
+        assert expired.get("0", now) is None
+
+    def test_no_cookie_sets_empty_session_state(self):
+        """Test that cookieless requests pass through with empty session state."""
+        app = FastAPI()
+        app.add_middleware(SessionMiddleware)
+
+        @app.get("/test")
+        async def test_endpoint(request: Request):
+            return {"session_id": request.state.session_id, "user_id": request.state.user_id}
+
+        response = TestClient(app).get("/test")
+        assert response.json() == {"session_id": None, "user_id": None}
+
+
 class TestCORSMiddleware:
     """Test CORS middleware functionality."""
 
@@ -333,6 +675,43 @@ class TestCORSMiddleware:
         assert response.headers.get("Access-Control-Allow-Credentials") == "true"
 
 
+class TestCORSFallbackMiddleware:
+    """Test preflight handling and CORS header backfill."""
+
+    @pytest.fixture
+    def app(self):
+        """Create test app with only the CORS fallback layer."""
+        app = FastAPI()
+        app.add_middleware(CORSFallbackMiddleware, allowed_origins=("http://allowed.test",))
+
+        @app.get("/test")
+        async def test_endpoint():
+            return {"message": "test"}
+
+        return app
+
+    def test_allowed_origin_is_echoed_without_trailing_slash(self, app):
+        """Test that an allowed origin is echoed back in normalized form."""
+        response = TestClient(app).get("/test", headers={"Origin": "http://allowed.test/"})
+
+        assert response.headers["Access-Control-Allow-Origin"] == "http://allowed.test"
+        assert response.headers["Access-Control-Allow-Credentials"] == "true"
+
+    def test_unknown_origin_gets_first_allowed_origin(self, app):
+        """Test that arbitrary origins are not reflected."""
+        response = TestClient(app).get("/test", headers={"Origin": "http://evil.test"})
+
+        assert response.headers["Access-Control-Allow-Origin"] == "http://allowed.test"
+
+    def test_preflight_for_unknown_origin(self, app):
+        """Test that preflight for an unknown origin answers with a wildcard origin."""
+        response = TestClient(app).options("/test", headers={"Origin": "http://evil.test"})
+
+        assert response.status_code == 200
+        assert response.headers["Access-Control-Allow-Origin"] == "*"
+        assert response.headers["Access-Control-Allow-Headers"] == "*"
+
+
 class TestTrustedHostMiddleware:
     """Test Trusted Host middleware functionality."""
 
@@ -472,6 +851,93 @@ class TestMiddlewareSetup:
         # Should have request ID from RequestIDMiddleware
         assert "X-Request-ID" in response.headers
 
+    def test_preflight_answered_for_get_only_route(self):
+        """Test that OPTIONS gets a 200 preflight response even without an OPTIONS route."""
+        app = FastAPI()
+        setup_middleware(app)
+
+        @app.get("/items")
+        async def items_endpoint():
+            return []
+
+        response = TestClient(app).options(
+            "/items",
+            headers={
+                "Origin": "http://localhost:3000",
+                "Access-Control-Request-Method": "GET",
+                "Access-Control-Request-Headers": "Authorization",
+            },
+        )
+
+        assert response.status_code == 200
+        assert response.headers["Access-Control-Allow-Headers"] == "Authorization"
+        assert response.headers["Access-Control-Allow-Credentials"] == "true"
+        assert response.headers["Access-Control-Max-Age"] == "86400"
+
+    def test_public_paths_skip_observability(self):
+        """Test that health/docs paths get security, ID and timing headers but no tracing."""
+        app = FastAPI()
+        setup_middleware(app)
+
+        @app.get("/health")
+        async def health_endpoint():
+            return {"status": "ok"}
+
+        response = TestClient(app).get("/health")
+
+        assert response.status_code == 200
+        assert response.json() == {"status": "ok"}
+        assert response.headers["X-Content-Type-Options"] == "nosniff"
+        assert len(response.headers["X-Request-ID"]) == 36
+        assert float(response.headers["X-Process-Time"]) >= 0
+        assert "X-Trace-Id" not in response.headers
+
+        echoed = TestClient(app).get("/health", headers={"X-Request-ID": "probe-1"})
+        assert echoed.headers["X-Request-ID"] == "probe-1"
+
+    def test_versioned_probe_paths_skip_observability(self):
+        """Test that probes under the API prefix short-circuit, by whole path segment."""
+        app = FastAPI()
+        setup_middleware(app)
+
+        @app.get("/api/v1/health")
+        async def health_endpoint(request: Request):
+            return {"public_path": request.state.public_path}
+
+        @app.get("/healthcare")
+        async def healthcare_endpoint():
+            return {"status": "ok"}
+
+        client = TestClient(app)
+        response = client.get("/api/v1/health")
+        assert response.json() == {"public_path": True}
+        assert "X-Trace-Id" not in response.headers
+
+        observed = client.get("/healthcare", headers={"X-Trace-Id": "t-1"})
+        assert observed.headers["X-Trace-Id"] == "t-1"
+
+    def test_large_responses_compressed(self):
+        """Test that responses over 1 KiB are gzipped and small ones are not."""
+        app = FastAPI()
+        setup_middleware(app)
+
+        @app.get("/large")
+        async def large_endpoint():
+            return {"data": "x" * 4096}
+
+        @app.get("/small")
+        async def small_endpoint():
+            return {"data": "x"}
+
+        client = TestClient(app)
+        large = client.get("/large", headers={"Accept-Encoding": "gzip"})
+        small = client.get("/small", headers={"Accept-Encoding": "gzip"})
+
+        assert large.headers.get("Content-Encoding") == "gzip"
+        assert large.json()["data"] == "x" * 4096
+        assert large.json()["request_id"] == large.headers["X-Request-ID"]
+        assert "Content-Encoding" not in small.headers
+
     def test_setup_exception_handlers(self):
         """Test that setup_exception_handlers adds all handlers."""
         app = FastAPI()
@@ -0,0 +1,31 @@
+"""Tests for the session cookie helper."""
+
+from fastapi import Response
+
+from app.services.cookie_helper import COOKIE_NAME, set_session_cookie
+
+
+def _starlette_cookie(value: str, **kwargs) -> bytes:
+    response = Response()
+    response.set_cookie(key=COOKIE_NAME, value=value, path="/", **kwargs)
+    return response.raw_headers[-1][1]
+
+
+def test_session_cookie_matches_starlette_rendering():
+    session_id = "1b4e28ba-2fa1-4d2b-a883-0123456789ab"
+    response = Response()
+    set_session_cookie(response, session_id, secure=True, same_site="Strict", max_age=60)
+
+    assert response.raw_headers[-1] == (
+        b"set-cookie",
+        _starlette_cookie(session_id, httponly=True, secure=True, samesite="strict", max_age=60),
+    )
+
+
+def test_session_cookie_quotes_unusual_values():
+    response = Response()
+    set_session_cookie(response, "a b;c", secure=False)
+
+    assert response.raw_headers[-1][1] == _starlette_cookie(
+        "a b;c", httponly=True, secure=False, samesite="lax", max_age=1800
+    )
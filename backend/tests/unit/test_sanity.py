@@ -5,13 +5,16 @@ This module provides sanity checks to validate the basic functionality
 of the backend test environment and core application components.
 """
 
+import io
+import logging
+
 import pytest
 import structlog
 from fastapi import FastAPI
 from fastapi.testclient import TestClient
 
 from app.core.config import get_settings
-from app.core.logging import setup_logging
+from app.core.logging import BatchedStreamHandler, filter_sensitive_data, setup_logging
 from app.main import create_app
 from app.telemetry.metrics import get_metrics_registry
 
@@ -94,6 +97,66 @@ class TestSettings:
         assert settings.DATABASE_URL.startswith("sqlite://") or \
                settings.DATABASE_URL.startswith("postgresql://")
 
+    def test_database_url_scheme_validation(self):
+        """Test that driver-qualified database URLs are accepted."""
+        from app.core.settings import Settings as AppSettings
+
+        for url in ("sqlite+aiosqlite:///./app.db", "postgresql+asyncpg://user@db/app"):
+            assert AppSettings(DATABASE_URL=url).DATABASE_URL == url
+
+        for url in ("oracle://db/app", "sqlite"):
+            with pytest.raises(ValueError):
+                AppSettings(DATABASE_URL=url)
+
+    def test_placeholder_secret_rejected_for_production_variants(self):
+        """Test that placeholder secrets fail for every spelling is_production() accepts."""
+        from app.core.settings import Settings as AppSettings
+
+        for environment in ("production", "Production", "prod"):
+            with pytest.raises(ValueError):
+                AppSettings(ENVIRONMENT=environment, SECRET_KEY="your-secret-key")
+
+        assert AppSettings(ENVIRONMENT="staging", SECRET_KEY="your-secret-key").SECRET_KEY == "your-secret-key"
+
+    def test_settings_summary_copies_are_independent(self):
+        """Test that mutating one settings summary does not affect later callers."""
+        from app.core.settings import get_settings_summary
+
+        summary = get_settings_summary()
+        summary.pop("environment")
+        summary["injected"] = True
+
+        fresh = get_settings_summary()
+        assert "environment" in fresh
+        assert "injected" not in fresh
+
+    def test_environment_checks_follow_updates(self):
+        """Test that is_* checks reflect ENVIRONMENT/TESTING changed after creation."""
+        from app.core.settings import Settings as AppSettings
+
+        app_settings = AppSettings(ENVIRONMENT="development", TESTING=False)
+        assert app_settings.is_development()
+
+        app_settings.ENVIRONMENT = "Production"
+        assert app_settings.is_production()
+        assert not app_settings.is_development()
+
+        app_settings.TESTING = True
+        assert app_settings.is_testing()
+
+        assert app_settings.model_copy(update={"ENVIRONMENT": "dev"}).is_development()
+
+    def test_database_scheme_follows_url_updates(self):
+        """Test that the cached database scheme is re-derived after DATABASE_URL changes."""
+        from app.core.settings import Settings as AppSettings
+
+        app_settings = AppSettings(DATABASE_URL="sqlite:///./app.db")
+        assert app_settings.database_scheme == "sqlite"
+
+        app_settings.DATABASE_URL = "postgresql+asyncpg://user@db/app"
+        assert app_settings.database_scheme == "postgresql+asyncpg"
+        assert app_settings.model_copy(update={"DATABASE_URL": "sqlite:///x.db"}).database_scheme == "sqlite"
+
 
 class TestLogging:
     """Test logging configuration and functionality."""
@@ -120,6 +183,43 @@ class TestLogging:
         assert 'processors' in config
         assert len(config['processors']) > 0
 
+    def test_filter_sensitive_data_redacts_without_mutating_input(self):
+        """Test sensitive keys are redacted and caller-owned data is left untouched."""
+        user_data = {"name": "John", "Password": "secret123", "meta": {"age": 35}}
+        event_dict = {"event": "User data processed", "user_data": user_data, "token": "abc"}
+
+        result = filter_sensitive_data(None, "info", event_dict)
+
+        assert result["token"] == "***REDACTED***"
+        assert result["user_data"]["Password"] == "***REDACTED***"
+        assert result["user_data"]["meta"] is user_data["meta"]
+        assert user_data["Password"] == "secret123"
+
+    def test_filter_sensitive_data_redacts_serialized_json(self):
+        """Test sensitive fields inside JSON strings are redacted."""
+        event_dict = {"body": '{"email": "a@b.c", "password": "secret123", "token": 42}'}
+
+        result = filter_sensitive_data(None, "info", event_dict)
+
+        assert "secret123" not in result["body"]
+        assert '"token": "***REDACTED***"' in result["body"]
+        assert '"email": "a@b.c"' in result["body"]
+
+    def test_batched_stream_handler_writes_batches(self):
+        """Test batched handler coalesces queued records and flushes on close."""
+        stream = io.StringIO()
+        handler = BatchedStreamHandler(stream, batch_size=3, batch_ms=1000)
+        writes = []
+        original_write = stream.write
+        stream.write = lambda text: writes.append(text) or original_write(text)
+
+        for i in range(4):
+            handler.emit(logging.makeLogRecord({"msg": f"line {i}", "levelno": logging.INFO}))
+        handler.close()
+
+        assert stream.getvalue() == "line 0\nline 1\nline 2\nline 3\n"
+        assert len(writes) == 2
+
 
 class TestMetrics:
     """Test metrics collection and registry functionality."""